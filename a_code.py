@@ -1,4 +1,3 @@
-import graphviz
 from collections import defaultdict
 import io
 import enum
@@ -65,12 +64,14 @@ class Definitions:
 
 
 class CodeGen:
-    __slots__ = ("out", "label_n", "temp_n")
+    __slots__ = ("out", "label_n", "temp_n", "origins")
 
     def __init__(self):
         self.out = io.StringIO()
         self.label_n = defaultdict(int)
         self.temp_n = 1
+        # Node that emitted each line of `out`
+        self.origins = []
 
     def gen_label(self, prefix):
         label = f":{prefix}_{self.label_n[prefix]}"
@@ -82,8 +83,35 @@ class CodeGen:
         self.temp_n += 1
         return temp
 
-    def write(self, string):
+    def write(self, string, origin=None):
         self.out.write(string + "\n")
+        self.origins.append(origin)
+
+    def source_map(self, spans=None):
+        # With the spans of the parsed program every line also gets the
+        # line:column of its node
+        out = []
+        for o in self.origins:
+            location = spans.location(o) if spans is not None else None
+            if location is None:
+                out.append(f"{describe(o)}\n")
+            else:
+                out.append(f"{describe(o)} {location}\n")
+
+        return "".join(out)
+
+
+def describe(node):
+    if node is None:
+        return "?"
+
+    name = type(node).__name__
+    if isinstance(node, (FunctionDefinition, FunctionCall)):
+        return f"{name} {node.fname.var_name}"
+    elif isinstance(node, Assignment):
+        return f"{name} {node.id_.var_name}"
+
+    return name
 
 
 class DotHelper:
@@ -108,6 +136,9 @@ class DotHelper:
 
 
 def draw(node):
+    # Imported here so that compiling without drawing does not load graphviz
+    import graphviz
+
     dot = graphviz.Digraph(comment="AST")
     dih = DotHelper(dot)
 
@@ -277,16 +308,16 @@ class FunctionDefinition(Node):
         l_f = f":{self.fname.real_name}"
 
         l_f_end = f"{l_f}_end"
-        codegen.write(f"goto {l_f_end}")
+        codegen.write(f"goto {l_f_end}", self)
 
-        codegen.write(l_f)
+        codegen.write(l_f, self)
 
         for p_type, p_id in self.parameters:
-            codegen.write(f"pop {p_id.real_name}")
+            codegen.write(f"pop {p_id.real_name}", self)
 
         self.body.gen_code(codegen)
-        codegen.write("return")
-        codegen.write(l_f_end)
+        codegen.write("return", self)
+        codegen.write(l_f_end, self)
 
     def type_check(self, defs: Definitions):
         defs.add_scope(f"f_{self.fname.var_name}_{id(self)}")
@@ -358,7 +389,7 @@ class Return(Node):
 
     def gen_code(self, codegen: CodeGen):
         exp_rv = self.exp.rvalue(codegen)
-        codegen.write(f"return {exp_rv}")
+        codegen.write(f"return {exp_rv}", self)
 
     def type_check(self, defs: Definitions):
         self.exp.type_check(defs)
@@ -390,9 +421,9 @@ class If(Node):
 
         test_rv = self.condition.rvalue(codegen)
 
-        codegen.write(f"ifFalse {test_rv} goto {l_if_skip}")
+        codegen.write(f"ifFalse {test_rv} goto {l_if_skip}", self)
         self.then_statement.gen_code(codegen)
-        codegen.write(l_if_skip)
+        codegen.write(l_if_skip, self)
 
     def type_check(self, defs: Definitions):
         self.condition.type_check(defs)
@@ -432,14 +463,14 @@ class IfElse(Node):
 
         test_rv = self.condition.rvalue(codegen)
 
-        codegen.write(f"ifFalse {test_rv} goto {l_if_else}")
+        codegen.write(f"ifFalse {test_rv} goto {l_if_else}", self)
         self.then_statement.gen_code(codegen)
-        codegen.write(f"goto {l_if_end}")
+        codegen.write(f"goto {l_if_end}", self)
 
-        codegen.write(l_if_else)
+        codegen.write(l_if_else, self)
         self.else_statement.gen_code(codegen)
 
-        codegen.write(l_if_end)
+        codegen.write(l_if_end, self)
 
     def type_check(self, defs: Definitions):
         self.condition.type_check(defs)
@@ -474,14 +505,14 @@ class While(Node):
         l_while_start = f"{l_while}_start"
         l_while_end = f"{l_while}_end"
 
-        codegen.write(l_while_start)
+        codegen.write(l_while_start, self)
 
         test_rv = self.condition.rvalue(codegen)
-        codegen.write(f"ifFalse {test_rv} goto {l_while_end}")
+        codegen.write(f"ifFalse {test_rv} goto {l_while_end}", self)
         self.body.gen_code(codegen)
-        codegen.write(f"goto {l_while_start}")
+        codegen.write(f"goto {l_while_start}", self)
 
-        codegen.write(l_while_end)
+        codegen.write(l_while_end, self)
 
     def type_check(self, defs: Definitions):
         self.condition.type_check(defs)
@@ -589,11 +620,11 @@ class FunctionCall(Expression):
         # Inserted in reverse order so that the first argument ends on the top of the
         # stack
         for t_a in reversed(aa):
-            codegen.write(f"push {t_a}")
+            codegen.write(f"push {t_a}", self)
 
         tv = codegen.gen_temp()
-        codegen.write(f"fcall :{self.fname.real_name}")
-        codegen.write(f"pop {tv}")
+        codegen.write(f"fcall :{self.fname.real_name}", self)
+        codegen.write(f"pop {tv}", self)
 
         return tv
 
@@ -643,7 +674,7 @@ class Assignment(Expression):
     def rvalue(self, codegen: CodeGen):
         exp_rv = self.exp.rvalue(codegen)
         id_lv = self.id_.lvalue(codegen)
-        codegen.write(f"{id_lv} = {exp_rv}")
+        codegen.write(f"{id_lv} = {exp_rv}", self)
         return self.id_
 
     def type_check(self, defs: Definitions):
@@ -658,7 +689,7 @@ class Assignment(Expression):
         self.type_ = self.id_.type_
 
 
-class LNot:
+class LNot(Node):
     __slots__ = ("exp",)
 
     type_ = Type.BOOL
@@ -669,7 +700,7 @@ class LNot:
     def rvalue(self, codegen: CodeGen):
         exp_rv = self.exp.rvalue(codegen)
         tv = codegen.gen_temp()
-        codegen.write(f"{tv} = not {exp_rv}")
+        codegen.write(f"{tv} = not {exp_rv}", self)
 
         return tv
 
@@ -711,7 +742,7 @@ class BinaryExp(Expression):
 
         tv = codegen.gen_temp()
 
-        codegen.write(f"{tv} = {exp1_rv} {self.op} {exp2_rv}")
+        codegen.write(f"{tv} = {exp1_rv} {self.op} {exp2_rv}", self)
 
         return tv
 
@@ -877,7 +908,7 @@ class Puts(Node):
         return id_
 
     def gen_code(self, codegen: CodeGen):
-        codegen.write(f"puts {repr(self.string)}")
+        codegen.write(f"puts {repr(self.string)}", self)
 
     def type_check(self, defs: Definitions):
         pass
@@ -899,7 +930,7 @@ class Putw(Node):
 
     def gen_code(self, codegen: CodeGen):
         exp_rv = self.exp.rvalue(codegen)
-        codegen.write(f"putw {exp_rv}")
+        codegen.write(f"putw {exp_rv}", self)
 
     def type_check(self, defs: Definitions):
         self.exp.type_check(defs)
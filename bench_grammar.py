@@ -0,0 +1,113 @@
+import argparse
+import time
+
+import c_lex
+import c_yacc
+import frontend
+
+# Expression heavy code, the shape where unit productions cost the most
+PROGRAM = """
+int a, b, c;
+
+int f(int x, int y) {
+  return x * y + (x - y) / 2;
+}
+
+int main() {
+  a = 1;
+  b = 2;
+  c = 3;
+%s
+  putw(a);
+  return 0;
+}
+"""
+
+STATEMENTS = """
+  a = a + b * c - f(a, b) % 7;
+  if (a < b && b <= c || !(a == c)) {
+    b = (a + 1) * (b - 1) / (c + 1);
+  } else {
+    c = f(c, a - b) + f(b, 1);
+  }
+  while (a > 100) a = a - 1;
+"""
+
+
+class ReductionCounter:
+    """Parser debug log that only counts shifts and reductions."""
+
+    __slots__ = ("shifts", "reductions")
+
+    def __init__(self):
+        self.shifts = 0
+        self.reductions = 0
+
+    def debug(self, msg, *args, **kwargs):
+        if msg.startswith("Action : Shift"):
+            self.shifts += 1
+
+    def info(self, msg, *args, **kwargs):
+        if msg.startswith("Action : Reduce"):
+            self.reductions += 1
+
+    def warning(self, msg, *args, **kwargs):
+        pass
+
+    error = critical = warning
+
+
+def count_tokens(text):
+    lexer = c_lex.lexer.clone()
+    lexer.input(text)
+    return sum(1 for _ in lexer)
+
+
+def reductions_per_token(text):
+    counter = ReductionCounter()
+    c_yacc.get_parser().parse(text, lexer=c_lex.lexer.clone(), debug=counter)
+    return counter.reductions / count_tokens(text)
+
+
+def throughput(text, repeat, engine=frontend.LALR):
+    parser = frontend.get_parser(engine)
+    n_tokens = count_tokens(text)
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(text)
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return n_tokens / best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Measure reductions per token and parse throughput"
+    )
+    arg_parser.add_argument("--statements", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument(
+        "--parser",
+        choices=frontend.ENGINES,
+        default=frontend.LALR,
+        help="engine whose throughput is measured",
+    )
+    args = arg_parser.parse_args()
+
+    text = PROGRAM % (STATEMENTS * args.statements)
+
+    print(f"tokens: {count_tokens(text)}")
+    print(f"reductions/token: {reductions_per_token(text):.3f}")
+    parser = c_yacc.get_parser()
+    print(f"tables: {parser.action.nbytes() + parser.goto.nbytes()} bytes")
+    t = throughput(text, args.repeat, args.parser)
+    print(f"{args.parser} throughput: {t:.0f} tokens/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# Modules a worker imports without parsing anything
+MODULES = ["c_yacc", "a_code", "interpret", "draw", "draw2"]
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MEASURE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import c_yacc
+print(elapsed, c_yacc._parser is not None, "graphviz" in sys.modules)
+"""
+
+
+def measure(module, cwd):
+    # A fresh interpreter per module, so nothing is already imported
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE.format(module=module)],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": HERE},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, built, graphviz = result.stdout.split()
+    return float(elapsed), built == "True", graphviz == "True"
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Check that importing the frontend stays cheap"
+    )
+    arg_parser.add_argument(
+        "--budget", type=float, default=0.25, help="seconds allowed per import"
+    )
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as cwd:
+        for module in MODULES:
+            results = [measure(module, cwd) for _ in range(args.repeat)]
+            best = min(elapsed for elapsed, _, _ in results)
+            built = any(b for _, b, _ in results)
+            graphviz = any(g for _, _, g in results)
+            print(f"{module:>10}: {best:.4f}s")
+
+            if best > args.budget:
+                failures.append(f"{module} took {best:.4f}s")
+            if built:
+                failures.append(f"{module} built the parser")
+            if graphviz:
+                failures.append(f"{module} imported graphviz")
+
+        if os.listdir(cwd):
+            failures.append(f"importing wrote {', '.join(os.listdir(cwd))}")
+
+    for f in failures:
+        print(f"FAIL: {f}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import time
+
+import frontend
+import incremental
+from check_parsers import dump
+
+FUNCTION = """
+int f%d(int x, int y) {
+  int z = x * y + %d;
+  while (z > 100) z = z - x;
+  if (z < y && !(x == y)) putw(z); else puts("none");
+  return z;
+}
+"""
+
+
+def program(n, edited=None, value=0):
+    # Function `edited` gets `value` as its constant instead of its index
+    return (
+        "".join(FUNCTION % (i, value if i == edited else i) for i in range(n))
+        + "int main() {\n  return f0(1, 2);\n}\n"
+    )
+
+
+def timed(parse, text):
+    start = time.perf_counter()
+    result = parse(text)
+    return result, time.perf_counter() - start
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Compare reparsing an edited program as a whole and incrementally"
+    )
+    arg_parser.add_argument("--functions", type=int, default=2000)
+    arg_parser.add_argument("--edits", type=int, default=5)
+    arg_parser.add_argument(
+        "--parser",
+        choices=frontend.ENGINES,
+        default=frontend.LALR,
+        help="engine parsing the programs and their changed items",
+    )
+    args = arg_parser.parse_args()
+
+    whole = frontend.get_parser(args.parser)
+    parser = incremental.Parser(args.parser)
+
+    text = program(args.functions)
+    _, first = timed(parser.parse, text)
+    print(f"first parse: {first:.3f}s")
+
+    failures = 0
+    for edit in range(args.edits):
+        text = program(args.functions, edit * args.functions // args.edits, -edit)
+        expected, full = timed(whole.parse, text)
+        result, partial = timed(parser.parse, text)
+        if dump(result) != dump(expected):
+            failures += 1
+            print(f"MISMATCH after edit {edit}", file=sys.stderr)
+        print(f"edit {edit}: whole {full:.3f}s, incremental {partial:.3f}s")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
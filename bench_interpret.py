@@ -0,0 +1,80 @@
+import argparse
+import functools
+import tempfile
+import time
+
+import a_code
+import c_yacc
+import interpret
+import threaded
+import transpile
+from output import Output
+
+# Same shape as test1.c: a factorial loop nested in a counting loop
+LOOP_PROGRAM = """
+int x, y;
+
+int main() {
+  int i = 0;
+  while (i < %d) {
+    x = 12;
+    y = 1;
+    while (x > 0) {
+      y = y * x;
+      x = x - 1;
+    }
+    i = i + 1;
+  }
+  putw(y);
+  return 0;
+}
+"""
+
+
+def compile_tac(text):
+    r = c_yacc.get_parser().parse(text)
+    r.type_check(a_code.Definitions())
+
+    cg = a_code.CodeGen()
+    r.gen_code(cg)
+    return cg.out.getvalue().splitlines()
+
+
+def measure(engine, tac, repeat):
+    best = None
+    for _ in range(repeat):
+        program = interpret.load(tac)
+        start = time.perf_counter()
+        engine(program, Output(capture=True))
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Compare interpreter engines")
+    arg_parser.add_argument("--iterations", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    tac = compile_tac(LOOP_PROGRAM % args.iterations)
+
+    # The python engine compiles on the first run and reads its cache after
+    with tempfile.TemporaryDirectory() as cache_dir:
+        engines = {
+            "decoded": interpret.run,
+            "threaded": threaded.run,
+            "python": functools.partial(transpile.run, cache_dir=cache_dir),
+        }
+        times = {name: measure(e, tac, args.repeat) for name, e in engines.items()}
+
+    for name, t in times.items():
+        speedup = times["decoded"] / t
+        print(f"{name:>10}: {t:.4f}s ({speedup:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
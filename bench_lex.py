@@ -0,0 +1,143 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import bench_grammar
+import c_lex
+import c_scan
+import parallel_lex
+
+
+def ply_tokens(text):
+    lexer = c_lex.lexer.clone()
+    lexer.input(text)
+    return list(lexer)
+
+
+SCANNERS = (("ply", ply_tokens), ("regex", c_lex.tokenize), ("dfa", c_scan.tokenize))
+
+
+def same_tokens(text, tokenize):
+    # Type, value and offset of every token from ply and a bulk scanner
+    expected = [(t.type, t.value, t.lexpos) for t in ply_tokens(text)]
+    tokens = tokenize(text)
+    got = [
+        (c_lex.tokens[tokens.types[i]], tokens.value(i), tokens.starts[i])
+        for i in range(len(tokens))
+    ]
+    return got == expected
+
+
+def measure(scan, text, repeat):
+    # Best time, and the memory the result keeps alive
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scan(text)
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    tracemalloc.start()
+    result = scan(text)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+
+    return best, size
+
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+
+def file_peaks(statements, workers):
+    # Peak memory of lexing a program file read into a str, and mapped as a
+    # c_lex.Source by one process and by the pool, per byte of source. The
+    # mapping itself and the memory of the workers are not counted
+    prefix, suffix = bench_grammar.PROGRAM.split("%s")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.c")
+        with open(path, "w") as f:
+            f.write(prefix)
+            for _ in range(statements):
+                f.write(bench_grammar.STATEMENTS)
+            f.write(suffix)
+        size = os.path.getsize(path)
+
+        def pool(text):
+            return parallel_lex.tokenize(text, workers, chunk_size=1)
+
+        scans = (
+            ("read", read_text, c_scan.tokenize),
+            ("mapped", c_lex.load_source, c_scan.tokenize),
+            ("pool", c_lex.load_source, pool),
+        )
+        peaks = {}
+        for name, load, scan in scans:
+            tracemalloc.start()
+            tokens = scan(load(path))
+            peaks[name] = tracemalloc.get_traced_memory()[1] / size
+            tracemalloc.stop()
+
+        arrays = (tokens.types, tokens.starts, tokens.ends)
+        kept = sum(a.itemsize * len(a) for a in arrays) / size
+        del tokens
+
+    return size, kept, peaks
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Compare the ply lexer with the bulk regex and DFA scanners, "
+        "and the DFA scanner run by a process pool"
+    )
+    arg_parser.add_argument("--statements", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count(),
+        help="processes of the pool scanner, each lexing an even share",
+    )
+    arg_parser.add_argument(
+        "--file-statements",
+        type=int,
+        default=5000,
+        help="size of the program file lexed to compare peak memory, 0 to skip",
+    )
+    args = arg_parser.parse_args()
+
+    text = bench_grammar.PROGRAM % (bench_grammar.STATEMENTS * args.statements)
+
+    def pool(text):
+        return parallel_lex.tokenize(text, args.workers, chunk_size=1)
+
+    scanners = SCANNERS + (("pool", pool),)
+    for name, scan in scanners[1:]:
+        if not same_tokens(text, scan):
+            print(f"FAIL: the {name} scanner disagrees with ply", file=sys.stderr)
+            sys.exit(1)
+
+    n_tokens = len(c_lex.tokenize(text))
+    print(f"tokens: {n_tokens}")
+    for name, scan in scanners:
+        t, size = measure(scan, text, args.repeat)
+        print(
+            f"{name:>5}: {n_tokens / t:9.0f} tokens/s {size / n_tokens:7.1f} bytes/token"
+        )
+
+    if args.file_statements:
+        size, kept, peaks = file_peaks(args.file_statements, args.workers)
+        print(f"file: {size / 1e6:.1f} MB, tokens: {kept:.2f} bytes per source byte")
+        for name, peak in peaks.items():
+            print(f"{name:>6}: peak {peak:.2f} bytes per source byte")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import sys
+import time
+
+import c_yacc
+
+# Many statements in one block, and many top-level items
+SHAPES = {
+    "statements": lambda n: "int main() {\n  int x = 0;\n"
+    + "  x = x + 1;\n" * n
+    + "  return x;\n}\n",
+    "globals": lambda n: "".join(f"int g{i};\n" for i in range(n))
+    + "int main() {\n  return 0;\n}\n",
+}
+
+
+def measure(text, repeat):
+    parser = c_yacc.get_parser()
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(text)
+        elapsed = time.perf_counter() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Check that parsing time grows linearly with program size"
+    )
+    arg_parser.add_argument("--min-statements", type=int, default=1000)
+    arg_parser.add_argument("--max-statements", type=int, default=1000000)
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    arg_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=2.0,
+        help="allowed growth of the time per statement from smallest to largest",
+    )
+    args = arg_parser.parse_args()
+
+    # The first parse pays for building the parser and warming up the lexer
+    measure(SHAPES["statements"](args.min_statements), 1)
+
+    failures = []
+    for shape, generate in SHAPES.items():
+        per_statement = []
+        n = args.min_statements
+        while n <= args.max_statements:
+            t = measure(generate(n), args.repeat)
+            per_statement.append(t / n)
+            print(f"{shape:>10} {n:>9}: {t:9.3f}s {1e6 * t / n:8.2f}us/statement")
+            n *= 10
+
+        growth = per_statement[-1] / per_statement[0]
+        if growth > args.tolerance:
+            failures.append(f"{shape}: time per statement grew {growth:.2f}x")
+
+    for f in failures:
+        print(f"FAIL: {f}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
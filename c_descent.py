@@ -0,0 +1,387 @@
+import a_code as c
+import c_lex
+import c_scan
+from c_lex import ParseError
+
+# Binding power of each binary operator, the same levels as the precedence
+# table of c_yacc. All of them are left associative
+BINARY_PRECEDENCE = {
+    "LOR": 1,
+    "LAND": 2,
+    "EQ": 3,
+    "NE": 3,
+    "LT": 4,
+    "LE": 4,
+    "GT": 4,
+    "GE": 4,
+    "PLUS": 5,
+    "MINUS": 5,
+    "TIMES": 6,
+    "DIVIDE": 6,
+    "MOD": 6,
+}
+LNOT_PRECEDENCE = 7
+
+BINARY_NODES = {
+    "LOR": c.LOr,
+    "LAND": c.LAnd,
+    "EQ": c.EQ,
+    "NE": c.NE,
+    "LT": c.LT,
+    "LE": c.LE,
+    "GT": c.GT,
+    "GE": c.GE,
+    "PLUS": c.Plus,
+    "MINUS": c.Minus,
+    "TIMES": c.Times,
+    "DIVIDE": c.Divide,
+    "MOD": c.Mod,
+}
+
+TYPES = {"INT": c.Type.INT, "BOOL": c.Type.BOOL}
+
+END = "$end"
+
+# Kinds of the statements and expressions waiting on the parse stacks for a
+# part nested in them
+(
+    IF,
+    IF_ELSE,
+    WHILE,
+    BLOCK,
+    EXPRESSION,
+    ASSIGNMENT,
+    CALL,
+    NOT,
+    PARENTHESES,
+) = range(9)
+
+
+class Parser:
+    """Recursive descent parser building the same AST as c_yacc.
+
+    Statements are parsed by recursive descent and expressions by
+    precedence climbing. The statements and expressions that nest are kept
+    on explicit stacks rather than in Python frames, so that nesting depth
+    is not bounded by the recursion limit.
+    """
+
+    __slots__ = ("tokens", "types", "pos", "spans")
+
+    def __init__(self):
+        self.tokens = None
+        self.types = []
+        self.pos = 0
+        self.spans = None
+
+    def parse(self, text, tracking=False):
+        # `tracking` is a span table to record node offsets in, see spans.Spans
+        return self.parse_tokens(c_scan.tokenize(text), tracking)
+
+    def parse_tokens(self, tokens, tracking=False):
+        # The tokens and position are kept on a new parser for every call, so
+        # that one parser can be used from several threads at once
+        parser = Parser()
+        parser.input(tokens, tracking)
+        return parser.program()
+
+    def input(self, tokens, tracking=False):
+        self.tokens = tokens
+        self.types = [c_lex.tokens[code] for code in tokens.types]
+        self.types.append(END)
+        self.pos = 0
+        self.spans = tracking or None
+
+    def value(self, i):
+        return self.tokens.value(i)
+
+    def error(self):
+        type_ = self.types[self.pos]
+        if type_ == END:
+            raise ParseError("Syntax error at end of input")
+
+        line = self.tokens.lineno(self.pos)
+        raise ParseError(
+            f"Syntax error at line {line}, token={type_} {self.value(self.pos)!r}"
+        )
+
+    def track(self, node, first):
+        # Records the span from token `first` to the last token consumed
+        if self.spans is not None:
+            tokens = self.tokens
+            self.spans.add(node, tokens.starts[first], tokens.ends[self.pos - 1])
+
+    def expect(self, type_):
+        if self.types[self.pos] != type_:
+            self.error()
+        self.pos += 1
+
+    def expect_value(self, type_):
+        # Only the values used are sliced out of the text, and decoded when it
+        # is a c_lex.Source
+        self.expect(type_)
+        return self.value(self.pos - 1)
+
+    def accept(self, type_):
+        if self.types[self.pos] == type_:
+            self.pos += 1
+            return True
+        return False
+
+    def type_(self):
+        t = TYPES.get(self.types[self.pos])
+        if t is None:
+            self.error()
+
+        self.pos += 1
+        return t
+
+    def program(self):
+        statements = []
+        while self.types[self.pos] != END:
+            first = self.pos
+            type_ = self.type_()
+            name = self.expect_value("ID")
+            if self.types[self.pos] == "L_PAREN":
+                node = self.function_definition(type_, name)
+            else:
+                node = self.variable_declaration(type_, name)
+            self.track(node, first)
+            statements.append(node)
+
+        block = c.Block(statements)
+        if self.spans is not None:
+            # Like the empty rule it is built from, the program starts at 0
+            end = 0
+            if self.pos:
+                end = self.tokens.ends[self.pos - 1]
+            self.spans.add(block, 0, end)
+
+        return block
+
+    def function_definition(self, type_, name):
+        self.expect("L_PAREN")
+        parameters = []
+        if self.types[self.pos] != "R_PAREN":
+            parameters.append(self.parameter())
+            while self.accept("COMMA"):
+                parameters.append(self.parameter())
+        self.expect("R_PAREN")
+
+        self.expect("L_BRACE")
+        body = self.statements()
+        self.expect("R_BRACE")
+
+        return c.FunctionDefinition(c.FId(name), type_, parameters, c.NSBlock(body))
+
+    def parameter(self):
+        type_ = self.type_()
+        if self.types[self.pos] == "ID":
+            return (type_, c.Id(self.expect_value("ID")))
+        return (type_,)
+
+    def variable_declaration(self, type_, name):
+        # The type and first name are already consumed
+        ret = []
+        while True:
+            id_ = c.Id(name)
+            ret.append(c.VariableDeclaration(id_, type_))
+            if self.accept("EQUALS"):
+                ret.append(c.Assignment(id_, self.expression()))
+
+            if not self.accept("COMMA"):
+                break
+            name = self.expect_value("ID")
+        self.expect("SEMICOLON")
+
+        return c.NSBlock(ret)
+
+    def statements(self):
+        statements = []
+        while self.types[self.pos] != "R_BRACE":
+            statements.append(self.statement())
+        return statements
+
+    def statement(self):
+        # Statements with a statement in them are pushed until the innermost
+        # one is parsed, and completed from the inside out
+        types = self.types
+        stack = []
+        while True:
+            first = self.pos
+            type_ = types[first]
+
+            if type_ == "IF" or type_ == "WHILE":
+                self.pos += 1
+                stack.append((IF if type_ == "IF" else WHILE, first, self.condition()))
+                continue
+            elif type_ == "L_BRACE" and types[first + 1] != "R_BRACE":
+                self.pos += 1
+                stack.append((BLOCK, first, []))
+                continue
+
+            node = self.simple_statement(type_)
+            self.track(node, first)
+
+            while True:
+                if not stack:
+                    return node
+
+                frame = stack.pop()
+                kind, first = frame[0], frame[1]
+                if kind == IF:
+                    # An else belongs to the innermost if, as in the LALR parser
+                    if self.accept("ELSE"):
+                        stack.append((IF_ELSE, first, frame[2], node))
+                        break
+                    node = c.If(frame[2], node)
+                elif kind == IF_ELSE:
+                    node = c.IfElse(frame[2], frame[3], node)
+                elif kind == WHILE:
+                    node = c.While(frame[2], node)
+                else:
+                    frame[2].append(node)
+                    if types[self.pos] != "R_BRACE":
+                        stack.append(frame)
+                        break
+                    self.pos += 1
+                    node = c.Block(frame[2])
+
+                self.track(node, first)
+
+    def simple_statement(self, type_):
+        # Any statement but if, while and non-empty blocks
+        if type_ == "RETURN":
+            self.pos += 1
+            exp = self.expression()
+            self.expect("SEMICOLON")
+            return c.Return(exp)
+        elif type_ == "PUTS":
+            self.pos += 1
+            self.expect("L_PAREN")
+            string = self.expect_value("STRING_LITERAL")[1:-1]
+            self.expect("R_PAREN")
+            self.expect("SEMICOLON")
+            return c.Puts(string)
+        elif type_ == "PUTW":
+            self.pos += 1
+            exp = self.condition()
+            self.expect("SEMICOLON")
+            return c.Putw(exp)
+        elif type_ == "L_BRACE":
+            self.pos += 2
+            return c.Block([])
+        elif type_ in TYPES:
+            declared = self.type_()
+            return self.variable_declaration(declared, self.expect_value("ID"))
+
+        exp = self.expression()
+        self.expect("SEMICOLON")
+        return exp
+
+    def condition(self):
+        self.expect("L_PAREN")
+        exp = self.expression()
+        self.expect("R_PAREN")
+        return exp
+
+    def expression(self, min_precedence=1):
+        # Every expression being parsed has an EXPRESSION frame holding its
+        # left operand and pending operator. Operands are parsed by
+        # `operand`, which pushes the unary constructs around them
+        types = self.types
+        stack = [(EXPRESSION, self.pos, min_precedence, None, None)]
+        while True:
+            node = self.operand(stack)
+
+            while True:
+                frame = stack.pop()
+                kind, first = frame[0], frame[1]
+                if kind == EXPRESSION:
+                    if frame[3] is not None:
+                        node = BINARY_NODES[frame[3]](frame[4], node)
+                        if self.spans is not None:
+                            self.track(node, first)
+
+                    op = types[self.pos]
+                    precedence = BINARY_PRECEDENCE.get(op)
+                    if precedence is not None and precedence >= frame[2]:
+                        self.pos += 1
+                        stack.append((EXPRESSION, first, frame[2], op, node))
+                        stack.append((EXPRESSION, self.pos, precedence + 1, None, None))
+                        break
+
+                    if not stack:
+                        return node
+                    continue
+
+                if kind == ASSIGNMENT:
+                    node = c.Assignment(c.Id(frame[2]), node)
+                elif kind == CALL:
+                    frame[3].append(node)
+                    if self.accept("COMMA"):
+                        stack.append(frame)
+                        stack.append((EXPRESSION, self.pos, 1, None, None))
+                        break
+                    self.expect("R_PAREN")
+                    node = c.FunctionCall(c.FId(frame[2]), frame[3])
+                elif kind == NOT:
+                    node = c.LNot(node)
+                else:
+                    # The enclosed expression takes the span with the parentheses
+                    self.expect("R_PAREN")
+
+                if self.spans is not None:
+                    self.track(node, first)
+
+    def operand(self, stack):
+        # Pushes the unary constructs in front of the next operand that has
+        # no expression in it, each followed by the expression it encloses,
+        # and returns that operand
+        types = self.types
+        while True:
+            first = self.pos
+            type_ = types[first]
+            self.pos += 1
+
+            if type_ == "ID":
+                value = self.value(first)
+                next_type = types[self.pos]
+                if next_type == "EQUALS":
+                    # The right hand side takes every operator that follows,
+                    # since EQUALS binds loosest
+                    self.pos += 1
+                    stack.append((ASSIGNMENT, first, value))
+                    stack.append((EXPRESSION, self.pos, 1, None, None))
+                    continue
+                elif next_type == "L_PAREN":
+                    self.pos += 1
+                    if types[self.pos] != "R_PAREN":
+                        stack.append((CALL, first, value, []))
+                        stack.append((EXPRESSION, self.pos, 1, None, None))
+                        continue
+                    self.pos += 1
+                    node = c.FunctionCall(c.FId(value), [])
+                else:
+                    node = c.Id(value)
+            elif type_ == "INT_LITERAL":
+                node = c.IntLiteral(int(self.value(first)))
+            elif type_ == "TRUE":
+                node = c.BoolLiteral(True)
+            elif type_ == "FALSE":
+                node = c.BoolLiteral(False)
+            elif type_ == "LNOT":
+                stack.append((NOT, first))
+                stack.append((EXPRESSION, self.pos, LNOT_PRECEDENCE, None, None))
+                continue
+            elif type_ == "L_PAREN":
+                stack.append((PARENTHESES, first))
+                stack.append((EXPRESSION, self.pos, 1, None, None))
+                continue
+            else:
+                self.pos -= 1
+                self.error()
+
+            if self.spans is not None:
+                self.track(node, first)
+            return node
@@ -0,0 +1,856 @@
+# Generated by parsergen.py from the c_yacc grammar; do not edit.
+
+import a_code as c
+import c_scan
+from c_lex import ParseError
+
+TOKENS = (
+    'CONTINUE', 'ELSE', 'FOR', 'IF', 'INT', 'BOOL',
+    'RETURN', 'VOID', 'WHILE', 'TRUE', 'FALSE', 'PUTW',
+    'PUTS', 'ID', 'INT_LITERAL', 'STRING_LITERAL', 'PLUS', 'MINUS',
+    'TIMES', 'DIVIDE', 'MOD', 'LOR', 'LAND', 'LNOT',
+    'LT', 'LE', 'GT', 'GE', 'EQ', 'NE',
+    'EQUALS', 'L_PAREN', 'R_PAREN', 'L_BRACE', 'R_BRACE', 'COMMA',
+    'SEMICOLON', '$end',
+)
+TOKEN_CODES = {name: i for i, name in enumerate(TOKENS)}
+NONTERMINALS = (
+    'program', 'function_definition', 'parameter_list', 'parameters',
+    'parameter', 'variable_declaration', 'statement', 'declaring_variables',
+    'declaring_variable', 'type', 'statements', 'expression',
+    'arguments',
+)
+
+N_TERMINALS = 38
+N_NONTERMINALS = 13
+END = 37
+ACCEPT = 106
+
+# Indexed by state * N_TERMINALS + token code: a state to shift to, a
+# negated rule to reduce by, ACCEPT, or 0 for a syntax error
+ACTION = (
+    0, 0, 0, 0, -3, -3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -3, 0, 0,
+    0, 0, 5, 6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 106, 0, 0, 0, 0,
+    -1, -1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -1, 0, 0, 0, 0, -2, -2,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -2, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 7, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, -17, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, -17, 0, 0, -17, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, -18, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    -18, 0, 0, -18, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 11, 10, 0, 0,
+    0, -15, -15, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 13,
+    12, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -13, -13, 0,
+    0, 0, 0, 0, 5, 6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -6, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0,
+    0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    -11, -11, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -11, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 26, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 27, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, -10, 0, 0, -10, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 28, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    -5, 0, 0, 29, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -8, 0,
+    0, -8, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    -30, -30, -30, -30, -30, -30, -30, 0, -30, -30, -30, -30, -30, -30, 31, 30, -30, 0, 0, -30,
+    -30, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33,
+    34, 35, 36, 37, 38, 0, 39, 41, 40, 42, 43, 44, 0, 0, 0, 0, 0, -16, -16, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0,
+    0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -31, -31, -31, -31, -31, -31,
+    -31, 0, -31, -31, -31, -31, -31, -31, 0, 0, -31, 0, 0, -31, -31, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -32, -32, -32, -32, -32, -32, -32, 0,
+    -32, -32, -32, -32, -32, -32, 0, 0, -32, 0, 0, -32, -32, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -33, -33, -33, -33, -33, -33, -33, 0, -33, -33,
+    -33, -33, -33, -33, 0, 0, -33, 0, 0, -33, -33, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0,
+    0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, -14, -14, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 11, 0,
+    0, 0, 0, -15, -15, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -9, 0,
+    0, -9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 47, 0, 0,
+    0, 0, 0, 0, 0, 0, 5, 6, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0,
+    0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 50, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0,
+    0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24,
+    0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0,
+    0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0,
+    0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21,
+    22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0,
+    0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0,
+    0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18,
+    23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0,
+    0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0,
+    0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0,
+    0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0,
+    0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24,
+    0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0,
+    0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 21, 22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0,
+    0, 0, 0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0, 39, 41, 40, 42, 43, 44,
+    0, 0, 66, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, -46, -46, -46, -46, -46, -46, -46, 0, -46, -46, -46, -46, -46, -46, 0, 0,
+    -46, 0, 0, -46, -46, 0, 0, 0, 0, -20, -20, -20, -20, 0, -20, -20, -20, -20, -20, -20,
+    -20, 0, 0, 0, 0, 0, 0, 0, 0, -20, 0, 0, 0, 0, 0, 0, 0, -20, 0, -20,
+    -20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -7, 0, 0, -7,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 68, 0, 0, 69, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -35, -35, -35, -35,
+    -35, -35, -35, 0, -35, -35, -35, -35, -35, -35, 0, 0, -35, 0, 0, -35, -35, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37,
+    38, 0, 39, 41, 40, 42, 43, 44, 0, 0, -37, 0, 0, -37, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0,
+    39, 41, 40, 42, 43, 44, 0, 0, -38, 0, 0, -38, -38, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -39, -39, 34, 35, 36, -39, -39, 0, -39, -39,
+    -39, -39, -39, -39, 0, 0, -39, 0, 0, -39, -39, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, -40, -40, 34, 35, 36, -40, -40, 0, -40, -40, -40, -40,
+    -40, -40, 0, 0, -40, 0, 0, -40, -40, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, -41, -41, -41, -41, -41, -41, -41, 0, -41, -41, -41, -41, -41, -41,
+    0, 0, -41, 0, 0, -41, -41, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, -42, -42, -42, -42, -42, -42, -42, 0, -42, -42, -42, -42, -42, -42, 0, 0,
+    -42, 0, 0, -42, -42, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, -43, -43, -43, -43, -43, -43, -43, 0, -43, -43, -43, -43, -43, -43, 0, 0, -43, 0,
+    0, -43, -43, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    32, 33, 34, 35, 36, -44, 38, 0, 39, 41, 40, 42, 43, 44, 0, 0, -44, 0, 0, -44,
+    -44, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33,
+    34, 35, 36, -45, -45, 0, 39, 41, 40, 42, 43, 44, 0, 0, -45, 0, 0, -45, -45, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35,
+    36, -47, -47, 0, -47, -47, -47, -47, -47, -47, 0, 0, -47, 0, 0, -47, -47, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, -48,
+    -48, 0, -48, -48, -48, -48, -48, -48, 0, 0, -48, 0, 0, -48, -48, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, -49, -49, 0,
+    -49, -49, -49, -49, -49, -49, 0, 0, -49, 0, 0, -49, -49, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, -50, -50, 0, -50, -50,
+    -50, -50, -50, -50, 0, 0, -50, 0, 0, -50, -50, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, -51, -51, 0, 39, 41, 40, 42,
+    -51, -51, 0, 0, -51, 0, 0, -51, -51, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, -52, -52, 0, 39, 41, 40, 42, -52, -52,
+    0, 0, -52, 0, 0, -52, -52, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, -29, -29, -29, -29, -29, -29, -29, 0, -29, -29, -29, -29, -29, -29, 0, 0,
+    -29, 0, 0, -29, -29, 0, 0, 0, 0, 76, 5, 6, 75, 0, 77, 21, 22, 79, 78, 18,
+    23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 71,
+    72, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    -34, -34, -34, -34, -34, -34, -34, 0, -34, -34, -34, -34, -34, -34, 0, 0, -34, 0, 0, -34,
+    -34, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0, 0, 0,
+    0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 26, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, -20, -20, -20, -20, 0, -20, -20, -20, -20, -20, -20, -20, 0, 0, 0, 0, 0, 0, 0,
+    0, -20, 0, 0, 0, 0, 0, 0, 0, -20, 0, -20, -20, 0, 0, 0, 0, 0, 0, 0,
+    -4, -4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, -4, 0, 0, 0, -19, -19, -19,
+    -19, 0, -19, -19, -19, -19, -19, -19, -19, 0, 0, 0, 0, 0, 0, 0, 0, -19, 0, 0,
+    0, 0, 0, 0, 0, -19, 0, -19, -19, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0, 39, 41, 40, 42,
+    43, 44, 0, 0, 0, 0, 0, 0, 83, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21,
+    22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0,
+    0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 85,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 86, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 87, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 88, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35,
+    36, 37, 38, 0, 39, 41, 40, 42, 43, 44, 0, 0, -36, 0, 0, -36, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 13, 89, 0, 0, 0, 0, 76,
+    5, 6, 75, 0, 77, 21, 22, 79, 78, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24,
+    0, 0, 0, 0, 0, 0, 0, 20, 0, 71, 90, 0, 0, 0, 0, -21, 0, -21, -21, -21,
+    -21, 0, -21, -21, -21, -21, -21, -21, -21, 0, 0, 0, 0, 0, 0, 0, 0, -21, 0, 0,
+    0, 0, 0, 0, 0, -21, 0, -21, -21, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0, 39, 41, 40, 42,
+    43, 44, 0, 0, 0, 0, 0, 0, 91, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21,
+    22, 0, 0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0,
+    0, 20, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0,
+    0, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 94, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 21, 22, 0, 0, 18, 23, 0,
+    0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 0, 0, 0,
+    0, 0, 0, -12, 0, -12, -12, -12, -12, 0, -12, -12, -12, -12, -12, -12, -12, 0, 0, 0,
+    0, 0, 0, 0, 0, -12, 0, 0, 0, 0, 0, 0, 0, -12, 0, -12, -12, 0, 0, 0,
+    0, -28, 0, -28, -28, -28, -28, 0, -28, -28, -28, -28, -28, -28, -28, 0, 0, 0, 0, 0,
+    0, 0, 0, -28, 0, 0, 0, 0, 0, 0, 0, -28, 0, -28, -28, 0, 0, 0, 0, -22,
+    0, -22, -22, -22, -22, 0, -22, -22, -22, -22, -22, -22, -22, 0, 0, 0, 0, 0, 0, 0,
+    0, -22, 0, 0, 0, 0, 0, 0, 0, -22, 0, -22, -22, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0,
+    39, 41, 40, 42, 43, 44, 0, 0, 96, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0, 39, 41,
+    40, 42, 43, 44, 0, 0, 97, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 98, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 32, 33, 34, 35, 36, 37, 38, 0, 39, 41, 40, 42, 43, 44,
+    0, 0, 99, 0, 0, 0, 0, 0, 0, 0, 0, 76, 5, 6, 75, 0, 77, 21, 22, 79,
+    78, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20,
+    0, 71, 0, 0, 0, 0, 0, 0, 0, 76, 5, 6, 75, 0, 77, 21, 22, 79, 78, 18,
+    23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0, 0, 0, 0, 20, 0, 71,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    102, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 103, 0,
+    0, 104, 0, -23, -23, -23, -23, 0, -23, -23, -23, -23, -23, -23, -23, 0, 0, 0, 0, 0,
+    0, 0, 0, -23, 0, 0, 0, 0, 0, 0, 0, -23, 0, -23, -23, 0, 0, 0, 0, -25,
+    0, -25, -25, -25, -25, 0, -25, -25, -25, -25, -25, -25, -25, 0, 0, 0, 0, 0, 0, 0,
+    0, -25, 0, 0, 0, 0, 0, 0, 0, -25, 0, -25, -25, 0, 0, 0, 0, -26, 0, -26,
+    -26, -26, -26, 0, -26, -26, -26, -26, -26, -26, -26, 0, 0, 0, 0, 0, 0, 0, 0, -26,
+    0, 0, 0, 0, 0, 0, 0, -26, 0, -26, -26, 0, 0, 0, 0, -27, 0, -27, -27, -27,
+    -27, 0, -27, -27, -27, -27, -27, -27, -27, 0, 0, 0, 0, 0, 0, 0, 0, -27, 0, 0,
+    0, 0, 0, 0, 0, -27, 0, -27, -27, 0, 0, 0, 0, 0, 0, 76, 5, 6, 75, 0,
+    77, 21, 22, 79, 78, 18, 23, 0, 0, 0, 0, 0, 0, 0, 0, 24, 0, 0, 0, 0,
+    0, 0, 0, 20, 0, 71, 0, 0, 0, 0, 0, -24, 0, -24, -24, -24, -24, 0, -24, -24,
+    -24, -24, -24, -24, -24, 0, 0, 0, 0, 0, 0, 0, 0, -24, 0, 0, 0, 0, 0, 0,
+    0, -24, 0, -24, -24, 0, 0, 0,
+)
+
+# Indexed by state * N_NONTERMINALS + nonterminal code
+GOTO = (
+    1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0, 3, 0,
+    0, 0, 4, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 8,
+    9, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 15, 16, 17, 0, 0, 0, 0, 14,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 19, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 25, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 45, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 46, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 48, 0, 0, 0, 0, 14, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 51, 49, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 52, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 53, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    54, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 55, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 56, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 57,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 58, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 59, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 60, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 61, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 62, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 63, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 64, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 65, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 67, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 73, 0, 0,
+    70, 0, 74, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 80, 0, 0, 0, 0, 0, 0, 0, 0, 81, 9, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 82, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 84, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 73, 0, 0, 70, 0, 74, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 92, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 93, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 95, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 100, 0, 0, 70, 0, 74,
+    0, 0, 0, 0, 0, 0, 0, 101, 0, 0, 70, 0, 74, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 105, 0,
+    0, 70, 0, 74, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+)
+
+# Whether the state is entered by shifting a token whose value is used:
+# ID, INT_LITERAL, STRING_LITERAL
+VALUED = (
+    0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0,
+    0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0,
+    0, 0, 0, 0, 0, 0,
+)
+
+
+# program -> program function_definition
+def rule_1(s1, s2):
+    s1.statements.append(s2)
+    result = s1
+    return result
+
+
+# program -> program variable_declaration
+def rule_2(s1, s2):
+    s1.statements.append(s2)
+    result = s1
+    return result
+
+
+# program -> <empty>
+def rule_3():
+    result = c.Block([])
+    return result
+
+
+# function_definition -> type ID L_PAREN parameter_list R_PAREN L_BRACE statements R_BRACE
+def rule_4(s1, s2, s3, s4, s5, s6, s7, s8):
+    result = c.FunctionDefinition(c.FId(s2), s1, s4, c.NSBlock(s7))
+    return result
+
+
+# parameter_list -> parameters
+def rule_5(s1):
+    result = s1
+    return result
+
+
+# parameter_list -> <empty>
+def rule_6():
+    result = []
+    return result
+
+
+# parameters -> parameters COMMA parameter
+def rule_7(s1, s2, s3):
+    s1.append(s3)
+    result = s1
+    return result
+
+
+# parameters -> parameter
+def rule_8(s1):
+    result = [s1]
+    return result
+
+
+# parameter -> type ID
+def rule_9(s1, s2):
+    result = (s1, c.Id(s2))
+    return result
+
+
+# parameter -> type
+def rule_10(s1):
+    result = (s1,)
+    return result
+
+
+# variable_declaration -> type declaring_variables SEMICOLON
+def rule_11(s1, s2, s3):
+    ret = []
+    for tup in s2:
+        if len(tup) == 2:
+            ret.append(c.VariableDeclaration(tup[0], s1))
+            ret.append(c.Assignment(tup[0], tup[1]))
+        else:
+            ret.append(c.VariableDeclaration(tup[0], s1))
+    result = c.NSBlock(ret)
+    return result
+
+
+# statement -> type declaring_variables SEMICOLON
+def rule_12(s1, s2, s3):
+    ret = []
+    for tup in s2:
+        if len(tup) == 2:
+            ret.append(c.VariableDeclaration(tup[0], s1))
+            ret.append(c.Assignment(tup[0], tup[1]))
+        else:
+            ret.append(c.VariableDeclaration(tup[0], s1))
+    result = c.NSBlock(ret)
+    return result
+
+
+# declaring_variables -> declaring_variable
+def rule_13(s1):
+    result = [s1]
+    return result
+
+
+# declaring_variables -> declaring_variables COMMA declaring_variable
+def rule_14(s1, s2, s3):
+    s1.append(s3)
+    result = s1
+    return result
+
+
+# declaring_variable -> ID
+def rule_15(s1):
+    result = (c.Id(s1),)
+    return result
+
+
+# declaring_variable -> ID EQUALS expression
+def rule_16(s1, s2, s3):
+    result = (c.Id(s1), s3)
+    return result
+
+
+# type -> INT
+def rule_17(s1):
+    result = c.Type.INT
+    return result
+
+
+# type -> BOOL
+def rule_18(s1):
+    result = c.Type.BOOL
+    return result
+
+
+# statements -> statements statement
+def rule_19(s1, s2):
+    s1.append(s2)
+    result = s1
+    return result
+
+
+# statements -> <empty>
+def rule_20():
+    result = []
+    return result
+
+
+# statement -> expression SEMICOLON
+def rule_21(s1, s2):
+    result = s1
+    return result
+
+
+# statement -> RETURN expression SEMICOLON
+def rule_22(s1, s2, s3):
+    result = c.Return(s2)
+    return result
+
+
+# statement -> IF L_PAREN expression R_PAREN statement
+def rule_23(s1, s2, s3, s4, s5):
+    result = c.If(s3, s5)
+    return result
+
+
+# statement -> IF L_PAREN expression R_PAREN statement ELSE statement
+def rule_24(s1, s2, s3, s4, s5, s6, s7):
+    result = c.IfElse(s3, s5, s7)
+    return result
+
+
+# statement -> WHILE L_PAREN expression R_PAREN statement
+def rule_25(s1, s2, s3, s4, s5):
+    result = c.While(s3, s5)
+    return result
+
+
+# statement -> PUTS L_PAREN STRING_LITERAL R_PAREN SEMICOLON
+def rule_26(s1, s2, s3, s4, s5):
+    result = c.Puts(s3[1:-1])
+    return result
+
+
+# statement -> PUTW L_PAREN expression R_PAREN SEMICOLON
+def rule_27(s1, s2, s3, s4, s5):
+    result = c.Putw(s3)
+    return result
+
+
+# statement -> L_BRACE statements R_BRACE
+def rule_28(s1, s2, s3):
+    result = c.Block(s2)
+    return result
+
+
+# expression -> L_PAREN expression R_PAREN
+def rule_29(s1, s2, s3):
+    result = s2
+    return result
+
+
+# expression -> ID
+def rule_30(s1):
+    result = c.Id(s1)
+    return result
+
+
+# expression -> TRUE
+def rule_31(s1):
+    result = c.BoolLiteral(True)
+    return result
+
+
+# expression -> FALSE
+def rule_32(s1):
+    result = c.BoolLiteral(False)
+    return result
+
+
+# expression -> INT_LITERAL
+def rule_33(s1):
+    result = c.IntLiteral(int(s1))
+    return result
+
+
+# expression -> ID L_PAREN arguments R_PAREN
+def rule_34(s1, s2, s3, s4):
+    result = c.FunctionCall(c.FId(s1), s3)
+    return result
+
+
+# expression -> ID L_PAREN R_PAREN
+def rule_35(s1, s2, s3):
+    result = c.FunctionCall(c.FId(s1), [])
+    return result
+
+
+# arguments -> arguments COMMA expression
+def rule_36(s1, s2, s3):
+    s1.append(s3)
+    result = s1
+    return result
+
+
+# arguments -> expression
+def rule_37(s1):
+    result = [s1]
+    return result
+
+
+# expression -> ID EQUALS expression
+def rule_38(s1, s2, s3):
+    result = c.Assignment(c.Id(s1), s3)
+    return result
+
+
+# expression -> expression PLUS expression
+def rule_39(s1, s2, s3):
+    result = c.Plus(s1, s3)
+    return result
+
+
+# expression -> expression MINUS expression
+def rule_40(s1, s2, s3):
+    result = c.Minus(s1, s3)
+    return result
+
+
+# expression -> expression TIMES expression
+def rule_41(s1, s2, s3):
+    result = c.Times(s1, s3)
+    return result
+
+
+# expression -> expression DIVIDE expression
+def rule_42(s1, s2, s3):
+    result = c.Divide(s1, s3)
+    return result
+
+
+# expression -> expression MOD expression
+def rule_43(s1, s2, s3):
+    result = c.Mod(s1, s3)
+    return result
+
+
+# expression -> expression LOR expression
+def rule_44(s1, s2, s3):
+    result = c.LOr(s1, s3)
+    return result
+
+
+# expression -> expression LAND expression
+def rule_45(s1, s2, s3):
+    result = c.LAnd(s1, s3)
+    return result
+
+
+# expression -> LNOT expression
+def rule_46(s1, s2):
+    result = c.LNot(s2)
+    return result
+
+
+# expression -> expression LT expression
+def rule_47(s1, s2, s3):
+    result = c.LT(s1, s3)
+    return result
+
+
+# expression -> expression GT expression
+def rule_48(s1, s2, s3):
+    result = c.GT(s1, s3)
+    return result
+
+
+# expression -> expression LE expression
+def rule_49(s1, s2, s3):
+    result = c.LE(s1, s3)
+    return result
+
+
+# expression -> expression GE expression
+def rule_50(s1, s2, s3):
+    result = c.GE(s1, s3)
+    return result
+
+
+# expression -> expression EQ expression
+def rule_51(s1, s2, s3):
+    result = c.EQ(s1, s3)
+    return result
+
+
+# expression -> expression NE expression
+def rule_52(s1, s2, s3):
+    result = c.NE(s1, s3)
+    return result
+
+
+# (nonterminal code, length, action) of each rule
+RULES = (
+    None,
+    (0, 2, rule_1),
+    (0, 2, rule_2),
+    (0, 0, rule_3),
+    (1, 8, rule_4),
+    (2, 1, rule_5),
+    (2, 0, rule_6),
+    (3, 3, rule_7),
+    (3, 1, rule_8),
+    (4, 2, rule_9),
+    (4, 1, rule_10),
+    (5, 3, rule_11),
+    (6, 3, rule_12),
+    (7, 1, rule_13),
+    (7, 3, rule_14),
+    (8, 1, rule_15),
+    (8, 3, rule_16),
+    (9, 1, rule_17),
+    (9, 1, rule_18),
+    (10, 2, rule_19),
+    (10, 0, rule_20),
+    (6, 2, rule_21),
+    (6, 3, rule_22),
+    (6, 5, rule_23),
+    (6, 7, rule_24),
+    (6, 5, rule_25),
+    (6, 5, rule_26),
+    (6, 5, rule_27),
+    (6, 3, rule_28),
+    (11, 3, rule_29),
+    (11, 1, rule_30),
+    (11, 1, rule_31),
+    (11, 1, rule_32),
+    (11, 1, rule_33),
+    (11, 4, rule_34),
+    (11, 3, rule_35),
+    (12, 3, rule_36),
+    (12, 1, rule_37),
+    (11, 3, rule_38),
+    (11, 3, rule_39),
+    (11, 3, rule_40),
+    (11, 3, rule_41),
+    (11, 3, rule_42),
+    (11, 3, rule_43),
+    (11, 3, rule_44),
+    (11, 3, rule_45),
+    (11, 2, rule_46),
+    (11, 3, rule_47),
+    (11, 3, rule_48),
+    (11, 3, rule_49),
+    (11, 3, rule_50),
+    (11, 3, rule_51),
+    (11, 3, rule_52),
+)
+
+
+def syntax_error(tokens, i):
+    if i >= len(tokens):
+        return ParseError("Syntax error at end of input")
+
+    name = TOKENS[tokens.types[i]]
+    return ParseError(
+        f"Syntax error at line {tokens.lineno(i)}, token={name} {tokens.value(i)!r}"
+    )
+
+
+def parse(text, tracking=False):
+    # `tracking` is a span table to record node offsets in, see spans.Spans
+    return parse_tokens(c_scan.tokenize(text), tracking)
+
+
+def parse_tokens(tokens, tracking=False):
+    # `tokens` is a c_lex.Tokens, whose type codes are the token codes here
+    if tracking:
+        return parse_tracked(tokens, tracking)
+
+    text = tokens.text
+    # A list indexes faster than an array, and small codes are not copied
+    codes = tokens.types.tolist()
+    codes.append(END)
+    starts = tokens.starts
+    ends = tokens.ends
+
+    action = ACTION
+    goto = GOTO
+    valued = VALUED
+    rules = RULES
+
+    states = [0]
+    values = [None]
+    state = 0
+    i = 0
+    code = codes[0]
+
+    while True:
+        a = action[state * N_TERMINALS + code]
+        if a > 0:
+            if a == ACCEPT:
+                return values[-1]
+
+            state = a
+            states.append(state)
+            # Other tokens are not sliced out of the text
+            values.append(text[starts[i] : ends[i]] if valued[state] else None)
+
+            i += 1
+            code = codes[i]
+        elif a < 0:
+            lhs, length, reduce = rules[-a]
+            if length == 1:
+                # Most reductions, done in place
+                values[-1] = reduce(values[-1])
+                state = goto[states[-2] * N_NONTERMINALS + lhs]
+                states[-1] = state
+                continue
+
+            if length:
+                result = reduce(*values[-length:])
+                del values[-length:]
+                del states[-length:]
+            else:
+                result = reduce()
+
+            state = goto[states[-1] * N_NONTERMINALS + lhs]
+            states.append(state)
+            values.append(result)
+        else:
+            raise syntax_error(tokens, i)
+
+
+def parse_tracked(tokens, spans):
+    # The untracked loop with the [start, end) offsets of every symbol kept
+    # on two more stacks
+    text = tokens.text
+    codes = tokens.types.tolist()
+    codes.append(END)
+    token_starts = tokens.starts
+    token_ends = tokens.ends
+
+    action = ACTION
+    goto = GOTO
+    valued = VALUED
+    rules = RULES
+
+    states = [0]
+    values = [None]
+    starts = [0]
+    ends = [0]
+    state = 0
+    i = 0
+    code = codes[0]
+
+    while True:
+        a = action[state * N_TERMINALS + code]
+        if a > 0:
+            if a == ACCEPT:
+                return values[-1]
+
+            state = a
+            start = token_starts[i]
+            end = token_ends[i]
+            states.append(state)
+            values.append(text[start:end] if valued[state] else None)
+            starts.append(start)
+            ends.append(end)
+
+            i += 1
+            code = codes[i]
+        elif a < 0:
+            lhs, length, reduce = rules[-a]
+            if length:
+                result = reduce(*values[-length:])
+                start = starts[-length]
+                end = ends[-1]
+                del values[-length:]
+                del states[-length:]
+                del starts[-length:]
+                del ends[-length:]
+            else:
+                result = reduce()
+                start = end = ends[-1]
+            spans.add(result, start, end)
+
+            state = goto[states[-1] * N_NONTERMINALS + lhs]
+            states.append(state)
+            values.append(result)
+            starts.append(start)
+            ends.append(end)
+        else:
+            raise syntax_error(tokens, i)
+
+
+class Parser:
+    """Same interface as the other parser engines."""
+
+    __slots__ = ()
+
+    def parse(self, text, tracking=False):
+        return parse(text, tracking)
+
+    def parse_tokens(self, tokens, tracking=False):
+        return parse_tokens(tokens, tracking)
@@ -1,3 +1,9 @@
+import array
+import bisect
+import itertools
+import mmap
+import re
+
 import ply.lex as lex
 
 reserved = (
@@ -104,10 +110,283 @@ def t_newline(t):
 
 
 def t_error(t):
-    print("Illegal character '%s'" % t.value[0])
+    illegal_character(t.value[0])
     t.lexer.skip(1)
 
 
+def illegal_character(char):
+    print("Illegal character '%s'" % char)
+
+
+def skip_illegal(text, offset):
+    # Reports the character at `offset` of a str or Source and returns the
+    # offset past it, which in a Source may be several bytes on
+    length = 1
+    if isinstance(text, Source):
+        lead = text.data[offset]
+        if 0xC0 <= lead < 0xF8:
+            length = 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+            following = text.data[offset + 1 : offset + length]
+            if len(following) < length - 1 or any(b >> 6 != 2 for b in following):
+                length = 1
+
+    illegal_character(text[offset : offset + length])
+    return offset + length
+
+
 lexer = lex.lex()
+
+# Integer code of each token type, its index in `tokens`. Codes fit in a byte
+CODES = {name: i for i, name in enumerate(tokens)}
+END = len(tokens)
+ID = CODES["ID"]
+RESERVED_CODES = {word: CODES[r] for word, r in reserved_dict.items()}
+# Value of the tokens whose text the grammar rules never read: they stand for
+# themselves, so their type name serves as their value
+FIXED_VALUES = {
+    t: t for t in tokens if t not in ("ID", "INT_LITERAL", "STRING_LITERAL")
+}
+
+# The master regex ply built from the rules above, so both scanners agree on
+# which rule wins. Comments and newlines give no token
+SCANNER = re.compile("|".join(lexer.lexretext), lexer.lexreflags)
+BYTES_SCANNER = re.compile("|".join(lexer.lexretext).encode(), lexer.lexreflags)
+RULE_CODES = {f"t_{name}": code for name, code in CODES.items()}
+RULE_CODES["t_comment"] = RULE_CODES["t_newline"] = None
+
+
+class ParseError(Exception):
+    """Raised by every parser engine for a program that is not valid."""
+
+
+class Source:
+    """Program text kept as UTF-8 bytes, usually a mapped file.
+
+    Slices are decoded when taken, so the scanners and parsers can use it in
+    place of a str without the whole text ever being decoded. Offsets are
+    byte offsets. `path` is the file mapped, if any.
+    """
+
+    __slots__ = ("data", "path")
+
+    def __init__(self, data, path=None):
+        self.data = data
+        self.path = path
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            key = slice(key, key + 1)
+        return self.data[key].decode(errors="replace")
+
+    def find(self, sub, start=0, end=None):
+        return self.data.find(
+            sub.encode(), start, len(self.data) if end is None else end
+        )
+
+    def count(self, sub, start=0, end=None):
+        sub = sub.encode()
+        end = len(self.data) if end is None else end
+        n = 0
+        i = self.data.find(sub, start, end)
+        while i != -1:
+            n += 1
+            i = self.data.find(sub, i + len(sub), end)
+        return n
+
+
+def load_source(path):
+    # The file mapped read-only. It stays mapped while the Source is alive
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            data = b""
+    return Source(data, path)
+
+
+# Characters of a text split into lines at a time while indexing them
+LINES_WINDOW = 1 << 20
+
+
+class Lines:
+    """Offsets at which the lines of a str or Source start.
+
+    The index is built in one pass of C-level splits over the text, and the
+    line and column of an offset are found by bisection when asked for, so
+    the scanners keep no line count.
+    """
+
+    __slots__ = ("starts",)
+
+    def __init__(self, text):
+        data, newline = text, "\n"
+        if isinstance(text, Source):
+            data, newline = text.data, b"\n"
+
+        self.starts = array.array("i" if len(data) < 1 << 31 else "q", [0])
+        for window in range(0, len(data), LINES_WINDOW):
+            lines = data[window : window + LINES_WINDOW].split(newline)
+            # Every line but the last ends with a newline in the window
+            lines.pop()
+            ends = itertools.accumulate(map((1).__add__, map(len, lines)))
+            self.starts.extend(map(window.__add__, ends))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lineno(self, offset):
+        return bisect.bisect_right(self.starts, offset)
+
+    def position(self, offset):
+        # 1-based line and column of an offset
+        line = bisect.bisect_right(self.starts, offset)
+        return line, offset - self.starts[line - 1] + 1
+
+
+class Tokens:
+    """Tokens of a text as parallel arrays of type codes and offsets.
+
+    Token `i` has the type `tokens[types[i]]` and the value
+    `text[starts[i]:ends[i]]`. No object is kept per token, and the arrays
+    can be walked by any number of passes. Lines are only indexed once a
+    line number is asked for.
+    """
+
+    __slots__ = ("text", "types", "starts", "ends", "line_index")
+
+    def __init__(self, text):
+        self.text = text
+        self.types = array.array("B")
+        # Offsets take 4 bytes unless the text is too long for them
+        offset = "i" if len(text) < 1 << 31 else "q"
+        self.starts = array.array(offset)
+        self.ends = array.array(offset)
+        self.line_index = None
+
+    def __len__(self):
+        return len(self.types)
+
+    def value(self, i):
+        return self.text[self.starts[i] : self.ends[i]]
+
+    def lines(self):
+        if self.line_index is None:
+            self.line_index = Lines(self.text)
+        return self.line_index
+
+    def lineno(self, i):
+        return self.lines().lineno(self.starts[i])
+
+
+def tokenize(text):
+    # The same tokens as `lexer`, in one pass over the text. A Source is
+    # scanned in place with the rules compiled for bytes
+    scanner = SCANNER
+    data = text
+    if isinstance(text, Source):
+        scanner = BYTES_SCANNER
+        data = text.data
+
+    tokens_ = Tokens(text)
+    add_type = tokens_.types.append
+    add_start = tokens_.starts.append
+    add_end = tokens_.ends.append
+    rule_codes = RULE_CODES
+    reserved_codes = RESERVED_CODES
+
+    pos = 0
+    for m in scanner.finditer(data):
+        start = m.start()
+        if start != pos:
+            for char in text[pos:start]:
+                if char not in t_ignore:
+                    illegal_character(char)
+        pos = m.end()
+
+        code = rule_codes[m.lastgroup]
+        if code is None:
+            continue
+        if code == ID:
+            code = reserved_codes.get(text[start:pos].lower(), ID)
+
+        add_type(code)
+        add_start(start)
+        add_end(pos)
+
+    for char in text[pos:]:
+        if char not in t_ignore:
+            illegal_character(char)
+
+    return tokens_
+
+
+class Token:
+    """Token given to ply, whose line number is looked up when first read."""
+
+    __slots__ = ("type", "value", "lexpos", "endlexpos", "lexer", "lineno")
+
+    def __init__(self, type_, value, lexpos, endlexpos, lexer):
+        self.type = type_
+        self.value = value
+        self.lexpos = lexpos
+        # Where the token ends, as the value may not span it
+        self.endlexpos = endlexpos
+        self.lexer = lexer
+
+    def __getattr__(self, name):
+        # Only called for attributes that were not set
+        if name == "lineno":
+            return self.lexer.tokens.lines().lineno(self.lexpos)
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return f"LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})"
+
+
+class TokenStream:
+    """Lexer interface over Tokens, for parsers that pull LexTokens."""
+
+    __slots__ = ("tokens", "i")
+
+    def __init__(self, tokens_):
+        self.tokens = tokens_
+        self.i = 0
+
+    def input(self, text):
+        self.__init__(tokenize(text))
+
+    @property
+    def lexpos(self):
+        # Offset just past the last token given out
+        return self.tokens.ends[self.i - 1] if self.i else 0
+
+    @property
+    def lineno(self):
+        return self.tokens.lines().lineno(self.lexpos)
+
+    def token(self):
+        tokens_ = self.tokens
+        i = self.i
+        if i >= len(tokens_.types):
+            return None
+        self.i = i + 1
+
+        type_ = tokens[tokens_.types[i]]
+        start = tokens_.starts[i]
+        end = tokens_.ends[i]
+        # Only the values rules read are sliced, and decoded from a Source
+        value = FIXED_VALUES.get(type_)
+        if value is None:
+            value = tokens_.text[start:end]
+        return Token(type_, value, start, end, self)
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+
 if __name__ == "__main__":
     lex.runmain(lexer)
@@ -1,6 +1,12 @@
+import os
+import sys
+import threading
+
 import a_code as c
 import c_lex
+import c_scan
 import ply.yacc as yacc
+from c_lex import ParseError
 
 tokens = c_lex.tokens
 
@@ -15,77 +21,62 @@ precedence = (
     ("left", "LNOT"),
 )
 
+# Statements and expressions are built directly by the productions that
+# consume their tokens, without unit productions in between, so that every
+# reduction creates a node
+
 
 def p_program(t):
     """
     program : program function_definition
             | program variable_declaration
-            | empty
+            |
     """
+    # Lists are extended in place; copying them would make parsing quadratic
     if len(t) == 3:
-        t[0] = c.Block(t[1].statements + [t[2]])
+        t[1].statements.append(t[2])
+        t[0] = t[1]
     else:
         t[0] = c.Block([])
 
 
-def p_empty(t):
-    """
-    empty :
-    """
-    t[0] = ("empty",)
-
-
-def p_id(t):
-    """
-    id : ID
-    """
-    t[0] = c.Id(t[1])
-
-
-def p_fid(t):
-    """
-    fid : ID
-    """
-    t[0] = c.FId(t[1])
-
-
 def p_function_definition(t):
     """
-    function_definition : type fid L_PAREN parameter_list R_PAREN statement_block
+    function_definition : type ID L_PAREN parameter_list R_PAREN L_BRACE statements R_BRACE
     """
-    sts = c.NSBlock(t[6].statements)
-    t[0] = c.FunctionDefinition(t[2], t[1], t[4], sts)
+    t[0] = c.FunctionDefinition(c.FId(t[2]), t[1], t[4], c.NSBlock(t[7]))
 
 
 def p_parameter_list(t):
     """
-    parameter_list : empty
-                   | parameter parameter_list_others
+    parameter_list : parameters
+                   |
     """
-    if len(t) == 3:
-        t[0] = [t[1]] + t[2]
+    if len(t) == 2:
+        t[0] = t[1]
     else:
         t[0] = []
 
 
-def p_parameter_list_others(t):
+def p_parameters(t):
     """
-    parameter_list_others : parameter_list_others COMMA parameter
-                          | empty
+    parameters : parameters COMMA parameter
+               | parameter
     """
     if len(t) == 2:
-        t[0] = []
+        t[0] = [t[1]]
     else:
-        t[0] = t[1] + [t[3]]
+        t[1].append(t[3])
+        t[0] = t[1]
 
 
 def p_parameter(t):
     """
-    parameter : type id
+    parameter : type ID
               | type
     """
     if len(t) == 3:
-        t[0] = (t[1], t[2])
+        t[0] = (t[1], c.Id(t[2]))
     else:
         t[0] = (t[1],)
 
@@ -93,6 +84,7 @@ def p_parameter(t):
 def p_variable_declaration(t):
     """
     variable_declaration : type declaring_variables SEMICOLON
+    statement : type declaring_variables SEMICOLON
     """
     ret = []
     for tup in t[2]:
@@ -113,305 +105,331 @@ def p_declaring_variables(t):
     if len(t) == 2:
         t[0] = [t[1]]
     else:
-        t[0] = t[1] + [t[3]]
+        t[1].append(t[3])
+        t[0] = t[1]
 
 
 def p_declaring_variable(t):
     """
-    declaring_variable : id
-                       | id EQUALS expression
+    declaring_variable : ID
+                       | ID EQUALS expression
     """
     if len(t) == 2:
-        t[0] = (t[1],)
+        t[0] = (c.Id(t[1]),)
     else:
-        t[0] = (t[1], t[3])
+        t[0] = (c.Id(t[1]), t[3])
 
 
-def p_s_return(t):
+def p_type_1(t):
     """
-    s_return : RETURN expression SEMICOLON
+    type : INT
     """
-    t[0] = c.Return(t[2])
+    t[0] = c.Type.INT
 
-def p_s_conditional(t):
+
+def p_type_2(t):
+    """
+    type : BOOL
     """
-    s_conditional : s_if
-                  | s_if_else
+    t[0] = c.Type.BOOL
+
+
+def p_statements(t):
+    """
+    statements : statements statement
+               |
+    """
+    if len(t) == 1:
+        t[0] = []
+    else:
+        t[1].append(t[2])
+        t[0] = t[1]
+
+
+def p_s_expression(t):
+    """
+    statement : expression SEMICOLON
     """
     t[0] = t[1]
 
 
+def p_s_return(t):
+    """
+    statement : RETURN expression SEMICOLON
+    """
+    t[0] = c.Return(t[2])
+
+
 def p_s_if(t):
     """
-    s_if : IF L_PAREN expression R_PAREN statement
+    statement : IF L_PAREN expression R_PAREN statement
     """
     t[0] = c.If(t[3], t[5])
 
 
 def p_s_if_else(t):
     """
-    s_if_else : IF L_PAREN expression R_PAREN statement ELSE statement
+    statement : IF L_PAREN expression R_PAREN statement ELSE statement
     """
     t[0] = c.IfElse(t[3], t[5], t[7])
 
 
-def p_type_1(t):
+def p_s_while(t):
     """
-    type : INT
+    statement : WHILE L_PAREN expression R_PAREN statement
     """
-    t[0] = c.Type.INT
+    t[0] = c.While(t[3], t[5])
 
 
-def p_type_2(t):
+def p_s_puts(t):
     """
-    type : BOOL
+    statement : PUTS L_PAREN STRING_LITERAL R_PAREN SEMICOLON
     """
-    t[0] = c.Type.BOOL
+    t[0] = c.Puts(t[3][1:-1])
 
 
-def p_expression(t):
+def p_s_putw(t):
     """
-    expression : L_PAREN expression R_PAREN
-               | id
-               | bool_literal
-               | int_literal
-               | e_function_call
-               | e_assign
-               | e_plus
-               | e_minus
-               | e_times
-               | e_divide
-               | e_mod
-               | e_lor
-               | e_land
-               | e_lnot
-               | e_lt
-               | e_gt
-               | e_le
-               | e_ge
-               | e_eq
-               | e_ne
-    """
-    if len(t) == 4:
-        t[0] = t[2]
-    else:
-        t[0] = t[1]
+    statement : PUTW L_PAREN expression R_PAREN SEMICOLON
+    """
+    t[0] = c.Putw(t[3])
 
 
 def p_statement_block(t):
     """
-    statement_block : L_BRACE statements R_BRACE
+    statement : L_BRACE statements R_BRACE
     """
     t[0] = c.Block(t[2])
 
 
-def p_statements(t):
+def p_e_group(t):
     """
-    statements : statements statement
-               | empty
-    """
-    if len(t) == 2:
-        t[0] = []
-    else:
-        t[0] = t[1] + [t[2]]
-
-
-def p_statement(t):
-    """
-    statement : expression SEMICOLON
-              | s_return
-              | s_conditional
-              | s_while
-              | s_puts
-              | s_putw
-              | statement_block
-              | variable_declaration
+    expression : L_PAREN expression R_PAREN
     """
-    t[0] = t[1]
+    t[0] = t[2]
 
 
-def p_s_while(t):
+def p_e_id(t):
     """
-    s_while : WHILE L_PAREN expression R_PAREN statement
+    expression : ID
     """
-    t[0] = c.While(t[3], t[5])
+    t[0] = c.Id(t[1])
 
 
 def p_bool_literal_1(t):
     """
-    bool_literal : TRUE
+    expression : TRUE
     """
     t[0] = c.BoolLiteral(True)
 
 
 def p_bool_literal_2(t):
     """
-    bool_literal : FALSE
+    expression : FALSE
     """
     t[0] = c.BoolLiteral(False)
 
 
 def p_int_literal(t):
     """
-    int_literal : INT_LITERAL
+    expression : INT_LITERAL
     """
     t[0] = c.IntLiteral(int(t[1]))
 
 
 def p_e_function_call(t):
     """
-    e_function_call : fid L_PAREN argument_list R_PAREN
-    """
-    t[0] = c.FunctionCall(t[1], t[3])
-
-
-def p_argument_list(t):
-    """
-    argument_list : empty
-                  | expression argument_list_others
+    expression : ID L_PAREN arguments R_PAREN
+               | ID L_PAREN R_PAREN
     """
-    if len(t) == 3:
-        t[0] = [t[1]] + t[2]
+    if len(t) == 5:
+        t[0] = c.FunctionCall(c.FId(t[1]), t[3])
     else:
-        t[0] = []
+        t[0] = c.FunctionCall(c.FId(t[1]), [])
 
 
-def p_argument_list_others(t):
+def p_arguments(t):
     """
-    argument_list_others : argument_list_others COMMA expression
-                         | empty
+    arguments : arguments COMMA expression
+              | expression
     """
     if len(t) == 2:
-        t[0] = []
+        t[0] = [t[1]]
     else:
-        t[0] = t[1] + [t[3]]
+        t[1].append(t[3])
+        t[0] = t[1]
 
 
 def p_e_assign(t):
     """
-    e_assign : id EQUALS expression
+    expression : ID EQUALS expression
     """
-    t[0] = c.Assignment(t[1], t[3])
+    t[0] = c.Assignment(c.Id(t[1]), t[3])
 
 
 def p_e_plus(t):
     """
-    e_plus : expression PLUS expression
+    expression : expression PLUS expression
     """
     t[0] = c.Plus(t[1], t[3])
 
 
 def p_e_minus(t):
     """
-    e_minus : expression MINUS expression
+    expression : expression MINUS expression
     """
     t[0] = c.Minus(t[1], t[3])
 
 
 def p_e_times(t):
     """
-    e_times : expression TIMES expression
+    expression : expression TIMES expression
     """
     t[0] = c.Times(t[1], t[3])
 
 
 def p_e_divide(t):
     """
-    e_divide : expression DIVIDE expression
+    expression : expression DIVIDE expression
     """
     t[0] = c.Divide(t[1], t[3])
 
 
 def p_e_mod(t):
-    "e_mod : expression MOD expression"
+    "expression : expression MOD expression"
     t[0] = c.Mod(t[1], t[3])
 
 
 def p_e_lor(t):
-    "e_lor : expression LOR expression"
+    "expression : expression LOR expression"
     t[0] = c.LOr(t[1], t[3])
 
 
 def p_e_land(t):
-    "e_land : expression LAND expression"
+    "expression : expression LAND expression"
     t[0] = c.LAnd(t[1], t[3])
 
 
 def p_e_lnot(t):
     """
-    e_lnot : LNOT expression
+    expression : LNOT expression
     """
     t[0] = c.LNot(t[2])
 
 
 def p_e_lt(t):
     """
-    e_lt : expression LT expression
+    expression : expression LT expression
     """
     t[0] = c.LT(t[1], t[3])
 
 
 def p_e_gt(t):
     """
-    e_gt : expression GT expression
+    expression : expression GT expression
     """
     t[0] = c.GT(t[1], t[3])
 
 
 def p_e_le(t):
     """
-    e_le : expression LE expression
+    expression : expression LE expression
     """
     t[0] = c.LE(t[1], t[3])
 
 
 def p_e_ge(t):
     """
-    e_ge : expression GE expression
+    expression : expression GE expression
     """
     t[0] = c.GE(t[1], t[3])
 
 
 def p_e_eq(t):
     """
-    e_eq : expression EQ expression
+    expression : expression EQ expression
     """
     t[0] = c.EQ(t[1], t[3])
 
 
 def p_e_ne(t):
     """
-    e_ne : expression NE expression
+    expression : expression NE expression
     """
     t[0] = c.NE(t[1], t[3])
 
 
-def p_string_literal(t):
-    """
-    string_literal : STRING_LITERAL
-    """
-    s = t[1][1:-1]
-    t[0] = s
+def p_error(t):
+    # Raised like the other engines do, instead of recovering from the error
+    if t is None:
+        raise ParseError("Syntax error at end of input")
 
+    value = t.value
+    if isinstance(t, c_lex.Token):
+        # Tokens of fixed text carry their type as value
+        value = t.lexer.tokens.text[t.lexpos : t.endlexpos]
+    raise ParseError(f"Syntax error at line {t.lineno}, token={t.type} {value!r}")
 
-def p_s_puts(t):
-    """
-    s_puts : PUTS L_PAREN string_literal R_PAREN SEMICOLON
-    """
-    t[0] = c.Puts(t[3])
 
+# LALR tables are rebuilt only when the grammar changes
+TABLE_CACHE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "__pycache__", "c_yacc.parsetab"
+)
 
-def p_s_putw(t):
-    """
-    s_putw : PUTW L_PAREN expression R_PAREN SEMICOLON
+_parser = None
+_parser_lock = threading.Lock()
+
+
+def get_parser(debug=False):
+    # Built on first use. A debug build always rebuilds the tables and
+    # describes them in parser.out in the working directory
+    global _parser
+
+    if _parser is None or debug:
+        # Only one thread builds the tables and writes the cache
+        with _parser_lock:
+            if _parser is None or debug:
+                _parser = yacc.yacc(
+                    debug=debug, module=sys.modules[__name__], tabfile=TABLE_CACHE
+                )
+
+    return _parser
+
+
+class Parser:
+    """Same interface as the other parser engines.
+
+    Every call parses with a lexer and parser state of its own, sharing only
+    the tables, so one Parser can be used from several threads at once.
     """
-    t[0] = c.Putw(t[3])
+
+    __slots__ = ()
+
+    def parse(self, text, tracking=False):
+        return self.parse_tokens(c_scan.tokenize(text), tracking)
+
+    def parse_tokens(self, tokens, tracking=False):
+        lexer = c_lex.TokenStream(tokens)
+        return get_parser().clone().parse(lexer=lexer, tracking=tracking)
+
+
+def __getattr__(name):
+    # Keeps `from c_yacc import parser` working without building at import
+    if name == "parser":
+        return get_parser()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-parser = yacc.yacc(debug=True)
 if __name__ == "__main__":
-    import sys
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Parse a program from stdin")
+    arg_parser.add_argument(
+        "--debug", action="store_true", help="write the parser tables to parser.out"
+    )
+    args = arg_parser.parse_args()
 
     text = sys.stdin.read()
-    r = parser.parse(text, tracking=True)
+    r = get_parser(debug=args.debug).parse(text)
     print(r)
@@ -0,0 +1,224 @@
+import os
+import sys
+import tempfile
+
+import a_code
+import c_yacc
+import interpret
+import tac_binary
+import threaded
+import transpile
+from bench_interpret import compile_tac
+from check_threads import canonical
+from output import Output
+from profiler import Profile
+
+CALLS_PROGRAM = """
+int f(int x) {
+  return x + 1;
+}
+
+int main() {
+  putw(f(1));
+  return 0;
+}
+"""
+
+
+def run_traced(text, trace):
+    output = Output(capture=True)
+    interpret.run(interpret.load(compile_tac(text)), output, trace=trace)
+    return canonical(output.getvalue().decode())
+
+
+def check_call_depths():
+    # main is at depth 1 when it is entered, called into and returned from
+    got = run_traced(CALLS_PROGRAM, interpret.TRACE_CALLS)
+    expected = (
+        "Call :block_0_main (depth 1)\n"
+        "Call :block_0_f (depth 2)\n"
+        "Return from :block_0_f (depth 2)\n"
+        "2\n"
+        "Return from :block_0_main (depth 1)\n"
+    )
+    return got, expected
+
+
+# Booleans are not let through putw by the type checker, but TAC written by
+# hand can print them
+BOOL_TAC = [
+    "goto :main_end",
+    ":main",
+    "b = true",
+    "c = not b",
+    "putw b",
+    "putw c",
+    "putw -7",
+    "return",
+    ":main_end",
+]
+
+
+def run_binary(program, output):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.tac")
+        with open(path, "wb") as f:
+            tac_binary.dump(program, f)
+        return tac_binary.run(tac_binary.load(path), output)
+
+
+def run_python(program, output):
+    # The python engine, caching its code in a directory of its own
+    with tempfile.TemporaryDirectory() as directory:
+        return transpile.run(program, output, directory)
+
+
+ENGINES = (interpret.run, threaded.run, run_python, run_binary)
+
+
+def run_engines(program):
+    # The output of every engine
+    got = []
+    for engine in ENGINES:
+        output = Output(capture=True)
+        engine(interpret.load(program), output)
+        got.append(output.getvalue())
+    return got
+
+
+def check_putw():
+    # Every engine writes what print wrote, whatever the type of the value
+    got = run_engines(BOOL_TAC)
+    return got, [b"True\nFalse\n-7\n"] * len(got)
+
+
+BIG_PROGRAM = """
+int main() {
+  int x = 99999999999999999999;
+  putw(x);
+  putw(0 - x - 9223372036854775807);
+  putw(9223372036854775807);
+  return 0;
+}
+"""
+
+
+def check_big_constants():
+    # Integer literals beyond int64 are kept whole in binary images as well
+    got = run_engines(compile_tac(BIG_PROGRAM))
+    expected = b"99999999999999999999\n-109223372036854775806\n"
+    return got, [expected + b"9223372036854775807\n"] * len(got)
+
+
+def check_bad_images():
+    # Empty and truncated images are reported as format errors
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.tac")
+        with open(path, "wb") as f:
+            tac_binary.dump(interpret.load(compile_tac(BIG_PROGRAM)), f)
+        with open(path, "rb") as f:
+            image = f.read()
+
+        got = []
+        for size in (0, 10, len(image) // 2, len(image) - 1):
+            with open(path, "wb") as f:
+                f.write(image[:size])
+            try:
+                tac_binary.load(path)
+                got.append(None)
+            except tac_binary.FormatError as e:
+                got.append(str(e))
+
+    expected = ["Truncated header", "Truncated header"] + ["Truncated image"] * 2
+    return got, expected
+
+
+DEEP_PROGRAM = """
+int sum(int n) {
+  if (n == 0) return 0;
+  return n + sum(n - 1);
+}
+
+int main() {
+  putw(sum(5000));
+  return 0;
+}
+"""
+
+
+def check_deep_recursion():
+    # Calls nest deeper than the default Python recursion limit
+    got = run_engines(compile_tac(DEEP_PROGRAM))
+    return got, [b"12502500\n"] * len(got)
+
+
+MAIN_PROGRAM = """
+int main() {
+  puts("main");
+  return 0;
+}
+
+int run_main() {
+  puts("run_main");
+  return 0;
+}
+"""
+
+
+def check_entry():
+    # A function whose name ends in main is not taken for it
+    output = Output(capture=True)
+    interpret.run(interpret.load(compile_tac(MAIN_PROGRAM)), output)
+    return output.getvalue(), b"main\n"
+
+
+def check_profile_source_map():
+    # The instruction entering main has no line in the source map
+    r = c_yacc.get_parser().parse("int main() {\n  putw(1);\n  return 0;\n}\n")
+    r.type_check(a_code.Definitions())
+    cg = a_code.CodeGen()
+    r.gen_code(cg)
+
+    program = interpret.load(cg.out.getvalue().splitlines())
+    profile = Profile(program)
+    interpret.run(program, Output(capture=True), profile=profile)
+    report = profile.report(program, cg.source_map().splitlines())
+
+    got = canonical(report.split("Hottest lines:\n")[1])
+    expected = (
+        "     count   line  origin                   instruction\n"
+        "         1      1  FunctionDefinition main  goto :block_0_main_end\n"
+        "         1      2  FunctionDefinition main  :block_0_main\n"
+        "         1      3  Putw                     putw 1\n"
+        "         1      4  Return                   return 0\n"
+        "         1      6  FunctionDefinition main  :block_0_main_end\n"
+        "         1      7  ?                        enter :block_0_main\n"
+    )
+    return got, expected
+
+
+CHECKS = [
+    check_call_depths,
+    check_putw,
+    check_big_constants,
+    check_bad_images,
+    check_deep_recursion,
+    check_entry,
+    check_profile_source_map,
+]
+
+
+def main():
+    failures = 0
+    for check in CHECKS:
+        got, expected = check()
+        if got != expected:
+            failures += 1
+            print(f"FAIL {check.__name__}: {got!r} != {expected!r}", file=sys.stderr)
+
+    print(f"{len(CHECKS)} checks, {failures} failures")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import random
+import sys
+import tempfile
+
+import c_lex
+import c_scan
+import parallel_lex
+
+CORPUS = [
+    "",
+    "\n",
+    "x\n",
+    "a\n/* b\n*/\nc\n",
+    'a\n"/*"\nb\nc */\nd\n',
+    '"a /* \nb\n */ c\n',
+    "/* no end\nx\ny\n",
+    'a"\\"/*"\nq\n*/\n',
+    "x /*/ y\n */ z\n/**/\n",
+]
+
+# Pieces of random texts, with comments, strings and illegal characters that
+# hide or fake newlines and comment openings
+PIECES = [
+    "int",
+    "x1",
+    "42",
+    "-7",
+    "+",
+    "*",
+    "/",
+    "=",
+    "==",
+    "(",
+    "}",
+    ";",
+    " ",
+    "\t",
+    "\n",
+    "\n\n",
+    "/*",
+    "*/",
+    "/* a\n b */",
+    '"',
+    '"s"',
+    '"/* not a comment"',
+    '"esc\\" /*"',
+    "\\",
+    "é",
+    "#",
+]
+
+
+def pooled(text, workers):
+    # Split into as many chunks as there are workers, however short the text
+    return parallel_lex.tokenize(text, workers, chunk_size=1)
+
+
+def in_process(text, parts):
+    # The chunks lexed one after another, to try many splits quickly
+    tokens = c_lex.Tokens(text)
+    function, arguments = parallel_lex.jobs(text, parts, tokens.starts.typecode)
+    return parallel_lex.join(tokens, itertools.starmap(function, arguments))
+
+
+def lexed(tokenize, *args):
+    # Types and offsets of the tokens, and what was printed while lexing
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        tokens = tokenize(*args)
+    return tokens.types, tokens.starts, tokens.ends, output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Check that lexing random texts in parallel chunks gives the "
+        "same tokens as lexing them whole"
+    )
+    arg_parser.add_argument("--random", type=int, default=300)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument(
+        "--workers", type=int, default=8, help="most workers splitting a text"
+    )
+    args = arg_parser.parse_args()
+
+    r = random.Random(args.seed)
+    # Long texts have chunks that start pages into a mapped file
+    lengths = [r.randrange(400) for _ in range(args.random)]
+    lengths += [r.randrange(4000, 12000) for _ in range(args.random // 50)]
+    texts = CORPUS + ["".join(r.choices(PIECES, k=n)) for n in lengths]
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as directory:
+        for i, text in enumerate(texts):
+            workers = r.randint(2, max(args.workers, 2))
+            # Chunks of a mapped file are lexed from its path
+            path = os.path.join(directory, f"text{i}.c")
+            with open(path, "wb") as f:
+                f.write(text.encode())
+
+            for source in (text, c_lex.Source(text.encode()), c_lex.load_source(path)):
+                expected = lexed(c_scan.tokenize, source)
+                results = [lexed(in_process, source, n) for n in range(2, 9)]
+                results.append(lexed(pooled, source, workers))
+                if any(result != expected for result in results):
+                    mismatches += 1
+                    print(f"MISMATCH: {text!r}", file=sys.stderr)
+
+    print(f"{len(texts)} texts, {mismatches} mismatches")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
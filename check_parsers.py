@@ -0,0 +1,237 @@
+import argparse
+import contextlib
+import enum
+import io
+import random
+import sys
+
+import frontend
+import incremental
+from spans import Spans
+
+CORPUS = [
+    "",
+    "int x;",
+    "int a, b = 2, c = b = 3; bool f;",
+    "int f() { return 1; } int g(int, bool b) { return f(); }",
+    """
+    int main() {
+      int x = 1 + 2 * 3 - 4 / 5 % 6, y;
+      bool b = !x < 4 == y || x && y >= x <= y > x != false;
+      x = y = (x + y) * (x - y);
+      b = x + y = 3 * 2 < 1;
+      b = !x = 3;
+      if (b) if (x) putw(x); else puts("inner else");
+      if (b) { putw(1); } else { while (x > 0) x = x - 1; }
+      puts("escaped \\" quote");
+      { int z; { z = main(); } }
+      return 0;
+    }
+    """,
+    # Invalid programs, which every engine rejects with the same message
+    "int x",
+    "}",
+    "int main() {\n  return 1\n}\n",
+    "int main() { x = ; }",
+    "int main() { if x) y; }",
+    "int main() { else x; }",
+    "int f(int a,) { }",
+    'int main() { puts(1); putw("s"); }',
+    "int x = (1 + 2;",
+    "int main() { int x; } int",
+]
+
+
+def nested(depth):
+    # Programs nesting every kind of statement and expression `depth` deep,
+    # deeper than the Python recursion limit
+    return [
+        "int main() { " + "if (x) " * depth + "x = 1; }",
+        "int main() { "
+        + "if (x) while (y) " * depth
+        + "x = 1;"
+        + " else x = 2;" * depth
+        + " }",
+        "int main() { " + "{ " * depth + "x = 1;" + " }" * depth + " }",
+        "int x = " + "(" * depth + "1" + ")" * depth + ";",
+        "bool b = " + "!" * depth + "x;",
+        "int main() { " + "x = " * depth + "1; }",
+        "int main() { " + "f(1, " * depth + "2" + ")" * depth + "; }",
+        "int x = " + "1 + (" * depth + "1" + ")" * depth + ";",
+    ]
+
+
+OPERATORS = ["+", "-", "*", "/", "%", "<", ">", "<=", ">=", "==", "!=", "&&", "||"]
+
+
+class Generator:
+    """Random programs that are syntactically valid, not necessarily typed."""
+
+    __slots__ = ("random", "names")
+
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.names = ["a", "b", "c", "f", "g"]
+
+    def expression(self, depth):
+        r = self.random
+        if depth <= 0:
+            return r.choice([r.choice(self.names), str(r.randint(0, 99)), "true"])
+
+        kind = r.randrange(7)
+        if kind < 3:
+            left = self.expression(depth - 1)
+            right = self.expression(depth - 1)
+            return f"{left} {r.choice(OPERATORS)} {right}"
+        elif kind == 3:
+            return f"({self.expression(depth - 1)})"
+        elif kind == 4:
+            return f"!{self.expression(depth - 1)}"
+        elif kind == 5:
+            return f"{r.choice(self.names)} = {self.expression(depth - 1)}"
+
+        arguments = [self.expression(depth - 1) for _ in range(r.randrange(3))]
+        return f"{r.choice(self.names)}({', '.join(arguments)})"
+
+    def statement(self, depth):
+        r = self.random
+        kind = r.randrange(8) if depth > 0 else 0
+        e = self.expression(3)
+
+        if kind == 0:
+            return f"{e};"
+        elif kind == 1:
+            return f"return {e};"
+        elif kind == 2:
+            return f"if ({e}) {self.statement(depth - 1)}"
+        elif kind == 3:
+            then = self.statement(depth - 1)
+            return f"if ({e}) {then} else {self.statement(depth - 1)}"
+        elif kind == 4:
+            return f"while ({e}) {self.statement(depth - 1)}"
+        elif kind == 5:
+            return r.choice([f"putw({e});", f'puts("{r.choice(self.names)}");'])
+        elif kind == 6:
+            body = " ".join(self.statement(depth - 1) for _ in range(r.randrange(3)))
+            return f"{{ {body} }}"
+
+        return f"int {r.choice(self.names)} = {e}, {r.choice(self.names)};"
+
+    def program(self):
+        r = self.random
+        items = []
+        for _ in range(r.randrange(1, 4)):
+            name = r.choice(self.names)
+            if r.randrange(2):
+                items.append(f"bool {name}, {name} = {self.expression(2)};")
+            else:
+                parameters = ", ".join(
+                    r.choice(["int", "bool"]) + r.choice(["", f" {name}"])
+                    for _ in range(r.randrange(3))
+                )
+                body = " ".join(self.statement(3) for _ in range(r.randrange(4)))
+                items.append(f"int {name}({parameters}) {{ {body} }}")
+
+        return "\n".join(items)
+
+
+def dump(node, spans=None):
+    # Structural representation of an AST, with the span of every node if
+    # given, for comparing the parsers. Built with an explicit stack of the
+    # text and values still to write, so deeply nested ASTs can be dumped
+    out = []
+    # (True, text) or (False, value), the next one on top
+    stack = [(False, node)]
+    while stack:
+        is_text, item = stack.pop()
+        if is_text:
+            out.append(item)
+            continue
+
+        if isinstance(item, (list, tuple)):
+            brackets = "[]" if isinstance(item, list) else "()"
+            parts = [(True, brackets[0])]
+            for i, n in enumerate(item):
+                if i:
+                    parts.append((True, ", "))
+                parts.append((False, n))
+            parts.append((True, brackets[1]))
+        elif item is None or isinstance(item, (str, int, enum.Enum)):
+            out.append(repr(item))
+            continue
+        else:
+            # Subclasses may list the slots of their bases again
+            slots = dict.fromkeys(
+                slot
+                for cls in reversed(type(item).__mro__)
+                for slot in getattr(cls, "__slots__", ())
+            )
+
+            span = ""
+            if spans is not None:
+                span = f"@{spans.span(item)}"
+
+            parts = [(True, f"{type(item).__name__}{span}(")]
+            for slot in slots:
+                if hasattr(item, slot):
+                    separator = ", " if len(parts) > 1 else ""
+                    parts.append((True, f"{separator}{slot}="))
+                    parts.append((False, getattr(item, slot)))
+            parts.append((True, ")"))
+
+        stack.extend(reversed(parts))
+
+    return "".join(out)
+
+
+def dumps(parser, text):
+    # Without tracking, then with the spans recorded while tracking. For an
+    # invalid program, the error raised. Engines must print nothing
+    spans = Spans(text)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            untracked = dump(parser.parse(text))
+            tracked = dump(parser.parse(text, tracking=spans), spans)
+        except frontend.ParseError as e:
+            untracked = tracked = f"ParseError: {e}"
+    return untracked, tracked + output.getvalue()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Check that every parser engine builds the same ASTs and spans"
+    )
+    arg_parser.add_argument("files", nargs="*", help="extra programs to compare")
+    arg_parser.add_argument("--random", type=int, default=500)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument(
+        "--depth", type=int, default=3000, help="nesting of the deep programs"
+    )
+    args = arg_parser.parse_args()
+
+    programs = list(CORPUS) + nested(args.depth)
+    for path in args.files:
+        with open(path) as f:
+            programs.append(f.read())
+    generator = Generator(args.seed)
+    programs += [generator.program() for _ in range(args.random)]
+
+    parsers = {engine: frontend.get_parser(engine) for engine in frontend.ENGINES}
+    parsers["incremental"] = incremental.Parser()
+
+    failures = 0
+    for text in programs:
+        results = {engine: dumps(p, text) for engine, p in parsers.items()}
+        if len(set(results.values())) != 1:
+            failures += 1
+            print(f"MISMATCH:\n{text}\n", file=sys.stderr)
+            for engine, (untracked, tracked) in results.items():
+                print(f"{engine}: {untracked}\n{tracked}\n", file=sys.stderr)
+
+    print(f"{len(programs)} programs, {failures} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import concurrent.futures
+import re
+import sys
+
+import a_code
+import bench_incremental
+import frontend
+from check_parsers import dump
+from spans import Spans
+
+# Ids of nodes in the names of the TAC, which differ between compilations
+NODE_ID = re.compile(r"\d{6,}")
+
+
+def canonical(tac):
+    # Numbers the node ids in order of first use
+    ids = dict()
+    return NODE_ID.sub(lambda m: str(ids.setdefault(m.group(), len(ids))), tac)
+
+
+def compile_program(parser, text):
+    # The AST with its spans and the TAC of one compilation
+    spans = Spans(text)
+    tree = parser.parse(text, tracking=spans)
+    shape = dump(tree, spans)
+
+    tree.type_check(a_code.Definitions())
+    cg = a_code.CodeGen()
+    tree.gen_code(cg)
+    return shape, canonical(cg.out.getvalue())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Check that compilations running in threads at once agree "
+        "with the same compilations run one after another"
+    )
+    arg_parser.add_argument("files", nargs="*", help="extra programs to compile")
+    arg_parser.add_argument("--threads", type=int, default=8)
+    arg_parser.add_argument("--compilations", type=int, default=400)
+    args = arg_parser.parse_args()
+
+    programs = [bench_incremental.program(n, n // 2, -n) for n in range(1, 9)]
+    for path in args.files:
+        with open(path) as f:
+            programs.append(f.read())
+
+    # Switching threads as often as possible makes races show up with the GIL
+    # too, free-threaded builds run them in parallel
+    sys.setswitchinterval(1e-6)
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{'with' if gil else 'without'} the GIL, {args.threads} threads")
+
+    failures = 0
+    for engine in frontend.ENGINES:
+        parser = frontend.get_parser(engine)
+        expected = [compile_program(parser, text) for text in programs]
+
+        jobs = [i % len(programs) for i in range(args.compilations)]
+        with concurrent.futures.ThreadPoolExecutor(args.threads) as pool:
+            results = pool.map(lambda i: compile_program(parser, programs[i]), jobs)
+            mismatches = sum(r != expected[i] for i, r in zip(jobs, results))
+
+        print(f"{engine}: {args.compilations} compilations, {mismatches} mismatches")
+        failures += mismatches
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,41 @@
+import argparse
 import sys
 
 import a_code
-from c_yacc import parser
+import c_lex
+import frontend
+from spans import Spans
 
 
 def main():
-    text = sys.stdin.read()
-    r = parser.parse(text, tracking=True)
+    arg_parser = argparse.ArgumentParser(description="Compile a program")
+    arg_parser.add_argument(
+        "input",
+        nargs="?",
+        help="program file, mapped into memory and lexed in place; stdin if not given",
+    )
+    arg_parser.add_argument(
+        "--source-map",
+        help="file to write the a_code node that emitted each TAC line to",
+    )
+    arg_parser.add_argument(
+        "--parser",
+        choices=frontend.ENGINES,
+        default=frontend.LALR,
+        help="frontend engine used to parse the program",
+    )
+    args = arg_parser.parse_args()
+
+    if args.input is not None:
+        text = c_lex.load_source(args.input)
+    else:
+        text = sys.stdin.read()
+    # Positions are only needed to locate the nodes of the source map
+    spans = Spans(text) if args.source_map is not None else None
+    try:
+        r = frontend.get_parser(args.parser).parse(text, tracking=spans)
+    except frontend.ParseError as e:
+        sys.exit(e)
 
     dot = a_code.draw(r)
     dot.render(directory="pngs/", view=True)
@@ -15,6 +44,10 @@ def main():
     r.gen_code(cg)
     print(cg.out.getvalue())
 
+    if args.source_map is not None:
+        with open(args.source_map, "w") as f:
+            f.write(cg.source_map(spans))
+
 
 if __name__ == "__main__":
     main()
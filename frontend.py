@@ -0,0 +1,26 @@
+import c_descent
+import c_lex
+import c_lalr
+import c_yacc
+
+LALR = "lalr"
+DESCENT = "descent"
+# The LALR parser generated from c_yacc by parsergen.py
+GENERATED = "generated"
+ENGINES = (LALR, DESCENT, GENERATED)
+
+# Raised by every engine for a program that is not syntactically valid
+ParseError = c_lex.ParseError
+
+
+def get_parser(engine=LALR):
+    # Every parser takes the program text and returns the a_code AST. The
+    # parsers keep no state between calls, so they can be shared by threads
+    if engine == DESCENT:
+        return c_descent.Parser()
+    elif engine == GENERATED:
+        return c_lalr.Parser()
+    elif engine == LALR:
+        return c_yacc.Parser()
+
+    raise ValueError(f"Unknown parser engine {engine!r}")
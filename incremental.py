@@ -0,0 +1,109 @@
+import re
+
+import a_code as c
+import frontend
+from spans import Spans
+
+# Braces and semicolons, skipping over the string literals and comments of
+# c_lex that may contain them
+BOUNDARY = re.compile(r'"(?:[^"\\\n]|\\.)*"|/\*(?s:.)*?\*/|([{};])')
+
+
+def top_level_chunks(text):
+    # [start, end) offsets of each top-level declaration or definition: a
+    # chunk ends at a semicolon or closing brace outside of any braces, and
+    # takes the blanks and comments before it
+    chunks = []
+    depth = 0
+    start = 0
+    for match in BOUNDARY.finditer(text):
+        char = match.group(1)
+        if char is None:
+            continue
+
+        if char == "{":
+            depth += 1
+            continue
+        elif char == "}":
+            depth -= 1
+
+        if depth <= 0:
+            chunks.append((start, match.end()))
+            start = match.end()
+            depth = 0
+
+    if text[start:].strip():
+        chunks.append((start, len(text)))
+
+    return chunks
+
+
+class Parser:
+    """Reparses only the top-level items whose source changed.
+
+    The program is split into its top-level items, and each item is parsed
+    on its own by the wrapped engine. The nodes of items whose source is the
+    same as in the previous parse are reused. A program with a syntax error
+    is parsed again as a whole, which raises ParseError once for the error
+    the engine finds first, as it would without the cache.
+
+    The cache belongs to one program being edited, so unlike the engines a
+    Parser is not meant to be shared by threads.
+    """
+
+    __slots__ = ("parser", "cache")
+
+    def __init__(self, engine=frontend.LALR):
+        self.parser = frontend.get_parser(engine)
+        # Chunk source -> [node, span entries relative to the chunk or None]
+        self.cache = dict()
+
+    def parse(self, text, tracking=False):
+        # `tracking` is a span table to record node offsets in, see spans.Spans
+        spans = tracking or None
+
+        cache = dict()
+        statements = []
+        for start, end in top_level_chunks(text):
+            source = text[start:end]
+            # Each cached item is taken once, so that a program repeating an
+            # item does not share nodes between the copies
+            entry = self.cache.pop(source, None)
+            if entry is None or (spans is not None and entry[1] is None):
+                entry = self.parse_chunk(source, spans is not None)
+                if entry is None:
+                    self.cache = dict()
+                    return self.parser.parse(text, tracking)
+
+            cache[source] = entry
+            statements.append(entry[0])
+            if spans is not None:
+                for node, node_start, node_end in entry[1]:
+                    spans.add(node, start + node_start, start + node_end)
+
+        # Only the items of the latest program are kept
+        self.cache = cache
+
+        block = c.Block(statements)
+        if spans is not None:
+            spans.add(block, 0, end if statements else 0)
+        return block
+
+    def parse_chunk(self, source, tracked):
+        spans = Spans(source) if tracked else None
+        try:
+            block = self.parser.parse(source, tracking=spans or False)
+        except frontend.ParseError:
+            return None
+
+        if not isinstance(block, c.Block) or len(block.statements) != 1:
+            return None
+
+        entries = None
+        if spans is not None:
+            entries = [
+                (node, spans.starts[i], spans.ends[i])
+                for node, i in spans.index.items()
+                if node is not block
+            ]
+        return [block.statements[0], entries]
@@ -1,121 +1,590 @@
+import argparse
+import ast
+import operator
+import re
 import sys
 
+from output import Output, StringPool
+from profiler import CallTimer, Profile
+
+# Opcodes of the decoded instruction records
+(
+    LABEL,
+    GOTO,
+    PUTS,
+    PUTW,
+    IF_FALSE,
+    RETURN,
+    RETURN_VALUE,
+    PUSH,
+    POP,
+    FCALL,
+    COPY,
+    NOT,
+    BINARY,
+    ENTER,
+) = range(14)
+
+
+# Operand kinds
+CONST, LOCAL, GLOBAL = range(3)
+
+
+def c_div(op1, op2):
+    # Integer division truncating towards zero, as in C
+    q = abs(op1) // abs(op2)
+    return q if (op1 < 0) == (op2 < 0) else -q
+
+
+def c_mod(op1, op2):
+    return op1 - op2 * c_div(op1, op2)
+
+
+# Every operator emitted by a_code.BinaryExp.rvalue
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": c_div,
+    "mod": c_mod,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "&&": lambda op1, op2: op1 and op2,
+    "||": lambda op1, op2: op1 or op2,
+}
+
+
+def specialize_binary(fn, kind1, kind2):
+    # Operand fetches are fixed here so handlers never look at operand kinds
+    if kind1 == CONST and kind2 == CONST:
+
+        def handler(frame, globals_, a, b):
+            return fn(a, b)
+
+    elif kind1 == CONST and kind2 == LOCAL:
+
+        def handler(frame, globals_, a, b):
+            return fn(a, frame[b])
+
+    elif kind1 == CONST and kind2 == GLOBAL:
+
+        def handler(frame, globals_, a, b):
+            return fn(a, globals_[b])
+
+    elif kind1 == LOCAL and kind2 == CONST:
+
+        def handler(frame, globals_, a, b):
+            return fn(frame[a], b)
+
+    elif kind1 == LOCAL and kind2 == LOCAL:
+
+        def handler(frame, globals_, a, b):
+            return fn(frame[a], frame[b])
+
+    elif kind1 == LOCAL and kind2 == GLOBAL:
+
+        def handler(frame, globals_, a, b):
+            return fn(frame[a], globals_[b])
+
+    elif kind1 == GLOBAL and kind2 == CONST:
+
+        def handler(frame, globals_, a, b):
+            return fn(globals_[a], b)
+
+    elif kind1 == GLOBAL and kind2 == LOCAL:
+
+        def handler(frame, globals_, a, b):
+            return fn(globals_[a], frame[b])
+
+    else:
+
+        def handler(frame, globals_, a, b):
+            return fn(globals_[a], globals_[b])
+
+    return handler
 
-def main():
-    code = []
-    for l in sys.stdin:
-        code.append(l.strip("\n"))
+
+def not_const(frame, globals_, a):
+    return not a
+
+
+def not_local(frame, globals_, a):
+    return not frame[a]
+
+
+def not_global(frame, globals_, a):
+    return not globals_[a]
+
+
+# Handlers indexed by (operator, first operand kind, second operand kind)
+BINARY_HANDLERS = {
+    (op, kind1, kind2): specialize_binary(fn, kind1, kind2)
+    for op, fn in OPERATORS.items()
+    for kind1 in (CONST, LOCAL, GLOBAL)
+    for kind2 in (CONST, LOCAL, GLOBAL)
+}
+NOT_HANDLERS = {CONST: not_const, LOCAL: not_local, GLOBAL: not_global}
+
+
+class Function:
+    __slots__ = ("label", "start", "end", "n_slots", "pool")
+
+    def __init__(self, label, start, end):
+        self.label = label
+        self.start = start
+        self.end = end
+        self.n_slots = 0
+        # Frames released by finished calls, reused by the next ones
+        self.pool = []
+
+    def new_frame(self):
+        if self.pool:
+            return self.pool.pop()
+        return [None] * self.n_slots
+
+    def release_frame(self, frame):
+        self.pool.append(frame)
+
+
+class Program:
+    __slots__ = (
+        "code",
+        "labels",
+        "instructions",
+        "functions",
+        "global_names",
+        "strings",
+        "entry",
+    )
+
+    def __init__(
+        self, code, labels, instructions, functions, global_names, strings, entry
+    ):
+        self.code = code
+        self.labels = labels
+        self.instructions = instructions
+        # Function records indexed by the position of their entry label
+        self.functions = functions
+        self.global_names = global_names
+        # Encoded puts strings, referenced by index from PUTS instructions
+        self.strings = strings
+        # Function started once the global initialisers have run
+        self.entry = entry
+
+
+def is_constant(operand):
+    return (
+        operand[0].isdigit()
+        or (operand[0] == "-" and operand[1:].isdigit())
+        or operand in ("true", "True", "false", "False")
+    )
+
+
+def constant_value(operand):
+    if operand in ("true", "True"):
+        return True
+    elif operand in ("false", "False"):
+        return False
+    return int(operand)
+
+
+def find_functions(code, labels):
+    # Function bodies are emitted as `goto :f_end`, `:f`, ..., `:f_end`
+    functions = dict()
+    for i, cl in enumerate(code[:-1]):
+        p = cl.split()
+        if p[0] != "goto" or not p[1].endswith("_end"):
+            continue
+
+        label = p[1][: -len("_end")]
+        if code[i + 1] == label and p[1] in labels:
+            functions[i + 1] = Function(label, i + 1, labels[p[1]])
+
+    return functions
+
+
+def find_main(functions):
+    # main by its own label, not functions whose names only end in main
+    main = None
+    for f in functions.values():
+        if f.label == ":main" or re.fullmatch(r":block_\d+_main", f.label):
+            main = f
+
+    return main
+
+
+def load(code):
+    code = [cl for cl in code if cl.strip()]
 
     labels = dict()
     for i, cl in enumerate(code):
         if cl[0] == ":":
             labels[cl] = i
 
-    states = [dict()]
-    stack = []
-    return_pointers = []
-    next_instruction = 0
+    functions = find_functions(code, labels)
 
-    def eval_operand(operand):
-        if operand[0].isdigit():
-            return int(operand)
-        elif operand == "true":
-            return True
-        elif operand == "false":
-            return False
-        else:
-            return states[-1][operand]
-
-    def eval_exp(exp):
-        op1 = eval_operand(exp[0])
-        if len(exp) == 1:
-            return op1
-        op2 = eval_operand(exp[2])
-
-        if exp[1] == "+":
-            return op1 + op2
-        elif exp[1] == "-":
-            return op1 - op2
-        elif exp[1] == "*":
-            return op1 * op2
-        elif exp[1] == "<":
-            return op1 < op2
-        elif exp[1] == ">":
-            return op1 > op2
-        elif exp[1] == "==":
-            return op1 == op2
-        else:
-            raise RuntimeError("Not implemented")
+    # Function owning each line, None for the global section
+    owners = [None] * len(code)
+    for f in functions.values():
+        for i in range(f.start, f.end):
+            owners[i] = f
+
+    # Globals are the names used outside of any function plus the ones
+    # declared in the scope the functions themselves are defined in
+    global_scopes = set()
+    for f in functions.values():
+        m = re.match(r":(block_\d+)_", f.label)
+        if m is not None:
+            global_scopes.add(m.group(1) + "_")
+
+    def is_global(name, owner):
+        return owner is None or name.startswith(tuple(global_scopes))
+
+    global_slots = dict()
+    local_slots = {f: dict() for f in functions.values()}
+
+    def resolve(name, owner):
+        if is_global(name, owner):
+            return (GLOBAL, global_slots.setdefault(name, len(global_slots)))
 
-    def eval_line(line):
-        nonlocal next_instruction
+        slots = local_slots[owner]
+        return (LOCAL, slots.setdefault(name, len(slots)))
 
-        p = line.split()
+    def decode_operand(operand, owner):
+        if is_constant(operand):
+            return (CONST, constant_value(operand))
+        return resolve(operand, owner)
+
+    strings = StringPool()
+    instructions = []
+    for cl, owner in zip(code, owners):
+        p = cl.split()
         if p[0][0] == ":":
-            pass
+            instructions.append((LABEL,))
         elif p[0] == "goto":
-            next_instruction = labels[p[1]]
-            return
+            instructions.append((GOTO, labels[p[1]]))
         elif p[0] == "puts":
-            print(states[-1][p[1]])
+            string = ast.literal_eval(cl.split(maxsplit=1)[1])
+            instructions.append((PUTS, strings.add(string)))
         elif p[0] == "putw":
-            print(states[-1][p[1]])
+            instructions.append((PUTW, decode_operand(p[1], owner)))
         elif p[0] == "ifFalse":
-            if states[-1][p[1]] is False:
-                next_instruction = labels[p[3]]
-                return
+            instructions.append((IF_FALSE, decode_operand(p[1], owner), labels[p[3]]))
         elif p[0] == "return":
             if len(p) == 1:
-                next_instruction = return_pointers.pop()
-                states.pop()
-                return
+                instructions.append((RETURN,))
             else:
-                stack.append(eval_exp(p[1:]))
-                next_instruction = return_pointers.pop()
-                states.pop()
-                return
+                instructions.append((RETURN_VALUE, decode_operand(p[1], owner)))
         elif p[0] == "push":
-            stack.append(eval_operand(p[1]))
+            instructions.append((PUSH, decode_operand(p[1], owner)))
         elif p[0] == "pop":
-            states[-1][p[1]] = stack.pop()
+            instructions.append((POP, resolve(p[1], owner)))
         elif p[0] == "fcall":
-            ns = states[-1].copy()
-            states.append(ns)
+            instructions.append((FCALL, functions[labels[p[1]]]))
+        elif len(p) == 3 and p[1] == "=":
+            instructions.append(
+                (COPY, resolve(p[0], owner), decode_operand(p[2], owner))
+            )
+        elif len(p) == 4 and p[1] == "=" and p[2] == "not":
+            kind, a = decode_operand(p[3], owner)
+            instructions.append((NOT, resolve(p[0], owner), NOT_HANDLERS[kind], a))
+        elif len(p) == 5 and p[1] == "=" and p[3] in OPERATORS:
+            kind1, a = decode_operand(p[2], owner)
+            kind2, b = decode_operand(p[4], owner)
+            handler = BINARY_HANDLERS[(p[3], kind1, kind2)]
+            instructions.append((BINARY, resolve(p[0], owner), handler, a, b))
+        else:
+            raise RuntimeError(f"Not implemented: {cl}")
 
-            return_pointers.append(next_instruction + 1)
+    for f, slots in local_slots.items():
+        f.n_slots = len(slots)
 
-            next_instruction = labels[p[1]]
-        elif p[1] == "=":
-            states[-1][p[0]] = eval_exp(p[2:])
+    # The global section runs first, skipping every function body through its
+    # guard, and then falls into the instruction that enters main
+    entry = find_main(functions)
+    if entry is not None:
+        code.append(f"enter {entry.label}")
+        instructions.append((ENTER, entry))
+
+    return Program(
+        code,
+        labels,
+        instructions,
+        functions,
+        list(global_slots),
+        strings.strings,
+        entry,
+    )
+
+
+# Trace levels of the decoded engine
+TRACE_OFF = "off"
+TRACE_INSTRUCTIONS = "instructions"
+TRACE_CALLS = "calls"
+TRACE_SAMPLED = "sampled"
+
+
+def run(program, output=None, trace=TRACE_OFF, sample_every=1000, profile=None):
+    if output is None:
+        output = Output()
+    write = output.write
+    write_text = output.write_text
+    putw = output.putw
+
+    code = program.code
+    strings = program.strings
+    instructions = program.instructions
+
+    globals_ = [None] * len(program.global_names)
+    frame = None
+    # Saved (function, frame, return pointer) of every active caller
+    calls = []
+    function = None
+    stack = []
+    next_instruction = 0
+
+    def eval_operand(operand):
+        kind, value = operand
+        if kind == CONST:
+            return value
+        elif kind == LOCAL:
+            return frame[value]
+        return globals_[value]
+
+    def store(destination, value):
+        kind, slot = destination
+        if kind == LOCAL:
+            frame[slot] = value
+        else:
+            globals_[slot] = value
+
+    def eval_instruction(ins):
+        nonlocal next_instruction, frame, function
+
+        op = ins[0]
+        if op == LABEL:
+            pass
+        elif op == GOTO:
+            next_instruction = ins[1]
+            return
+        elif op == PUTS:
+            write(strings[ins[1]])
+        elif op == PUTW:
+            putw(eval_operand(ins[1]))
+        elif op == IF_FALSE:
+            if eval_operand(ins[1]) is False:
+                next_instruction = ins[2]
+                return
+        elif op == RETURN or op == RETURN_VALUE:
+            if op == RETURN_VALUE:
+                stack.append(eval_operand(ins[1]))
+            function.release_frame(frame)
+            function, frame, next_instruction = calls.pop()
+            return
+        elif op == PUSH:
+            stack.append(eval_operand(ins[1]))
+        elif op == POP:
+            store(ins[1], stack.pop())
+        elif op == ENTER:
+            # Returning from the entry point ends the program
+            calls.append((None, None, len(instructions)))
+
+            function = ins[1]
+            frame = function.new_frame()
+            next_instruction = function.start
+            return
+        elif op == FCALL:
+            callee = ins[1]
+            calls.append((function, frame, next_instruction + 1))
+
+            function = callee
+            frame = callee.new_frame()
+            next_instruction = callee.start
+            return
+        elif op == COPY:
+            store(ins[1], eval_operand(ins[2]))
+        elif op == NOT:
+            store(ins[1], ins[2](frame, globals_, ins[3]))
+        elif op == BINARY:
+            store(ins[1], ins[2](frame, globals_, ins[3], ins[4]))
         else:
             raise RuntimeError("Not implemented")
 
         next_instruction += 1
 
-    while next_instruction < len(code):
-        line = code[next_instruction]
-        print(f"Evaluating: {line}")
-        eval_line(line)
-
-    main_label = None
-    for l in labels:
-        if l.endswith("main"):
-            main_label = l
-
-    if main_label is None:
-        print("Main not found")
-        return
-
-    next_instruction = labels[main_label]
-    while next_instruction < len(code):
-        # import pprint
-        # pprint.pprint(states)
-        # pprint.pprint(stack)
-        line = code[next_instruction]
-        print(f"Evaluating: {line}")
-        eval_line(line)
-
-    print("Done!")
+    # One loop per trace level so that running untraced checks nothing per step
+    def run_untraced():
+        end = len(instructions)
+        while next_instruction < end:
+            eval_instruction(instructions[next_instruction])
+
+    def run_instructions_traced():
+        end = len(instructions)
+        while next_instruction < end:
+            write_text(f"Evaluating: {code[next_instruction]}\n")
+            eval_instruction(instructions[next_instruction])
+
+    def run_calls_traced():
+        end = len(instructions)
+        while next_instruction < end:
+            ins = instructions[next_instruction]
+            if ins[0] == FCALL or ins[0] == ENTER:
+                write_text(f"Call {ins[1].label} (depth {len(calls) + 1})\n")
+            elif (ins[0] == RETURN or ins[0] == RETURN_VALUE) and function is not None:
+                write_text(f"Return from {function.label} (depth {len(calls)})\n")
+            eval_instruction(ins)
+
+    def run_sampled():
+        end = len(instructions)
+        countdown = sample_every
+        while next_instruction < end:
+            countdown -= 1
+            if countdown == 0:
+                countdown = sample_every
+                write_text(f"Sample: {code[next_instruction]} (depth {len(calls)})\n")
+            eval_instruction(instructions[next_instruction])
+
+    def run_profiled():
+        end = len(instructions)
+        counts = profile.counts
+        while next_instruction < end:
+            ins = instructions[next_instruction]
+            counts[next_instruction] += 1
+            if ins[0] == FCALL or ins[0] == ENTER:
+                timer.call(ins[1])
+            elif (ins[0] == RETURN or ins[0] == RETURN_VALUE) and function is not None:
+                timer.ret()
+            eval_instruction(ins)
+
+    if profile is not None:
+        timer = CallTimer(profile)
+        loop = run_profiled
+    else:
+        loop = {
+            TRACE_OFF: run_untraced,
+            TRACE_INSTRUCTIONS: run_instructions_traced,
+            TRACE_CALLS: run_calls_traced,
+            TRACE_SAMPLED: run_sampled,
+        }[trace]
+
+    try:
+        loop()
+    finally:
+        output.flush()
+
+    return program.entry is not None
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Run a TAC program from stdin")
+    arg_parser.add_argument(
+        "--engine",
+        choices=("decoded", "threaded", "python"),
+        default="decoded",
+        help="decoded instruction loop, closure-compiled threaded code or "
+        "TAC transpiled to Python",
+    )
+    arg_parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="keep the code compiled by the python engine in ~/.cache/tac_python",
+    )
+    arg_parser.add_argument(
+        "--trace",
+        choices=(TRACE_OFF, TRACE_INSTRUCTIONS, TRACE_CALLS, TRACE_SAMPLED),
+        default=TRACE_OFF,
+        help="what the decoded engine reports while running",
+    )
+    arg_parser.add_argument(
+        "--sample-every",
+        type=int,
+        default=1000,
+        help="instructions between samples with --trace sampled",
+    )
+    arg_parser.add_argument(
+        "--flush-threshold",
+        type=int,
+        default=1 << 16,
+        help="bytes of output buffered before writing them out",
+    )
+    arg_parser.add_argument(
+        "--profile",
+        metavar="REPORT",
+        help="profile the decoded engine and write a report to this file",
+    )
+    arg_parser.add_argument(
+        "--source-map",
+        help="a_code origin of every TAC line, as written by draw.py",
+    )
+    arg_parser.add_argument(
+        "--binary",
+        metavar="IMAGE",
+        help="run a binary TAC image written by tac_binary.py instead of stdin",
+    )
+    args = arg_parser.parse_args()
+
+    if args.profile is not None and (
+        args.engine != "decoded" or args.trace != TRACE_OFF
+    ):
+        arg_parser.error("profiling needs the decoded engine without tracing")
+    if args.binary is not None and (
+        args.engine != "decoded" or args.trace != TRACE_OFF or args.profile
+    ):
+        arg_parser.error("binary images run on their own engine")
+    if args.cache and args.engine != "python":
+        arg_parser.error("only the python engine caches compiled code")
+    if args.trace != TRACE_OFF and args.engine != "decoded":
+        arg_parser.error("tracing is only supported by the decoded engine")
+    if args.sample_every < 1:
+        arg_parser.error("--sample-every must be positive")
+
+    output = Output(limit=args.flush_threshold)
+
+    if args.binary is None:
+        program = load(l.strip("\n") for l in sys.stdin)
+
+    if args.binary is not None:
+        import tac_binary
+
+        found = tac_binary.run(tac_binary.load(args.binary), output)
+    elif args.engine == "threaded":
+        import threaded
+
+        found = threaded.run(program, output)
+    elif args.engine == "python":
+        import transpile
+
+        cache_dir = transpile.DEFAULT_CACHE_DIR if args.cache else None
+        found = transpile.run(program, output, cache_dir)
+    else:
+        profile = Profile(program) if args.profile is not None else None
+        found = run(
+            program,
+            output,
+            trace=args.trace,
+            sample_every=args.sample_every,
+            profile=profile,
+        )
+
+        if profile is not None:
+            source_map = None
+            if args.source_map is not None:
+                with open(args.source_map) as f:
+                    source_map = f.read().splitlines()
+
+            with open(args.profile, "w") as f:
+                f.write(profile.report(program, source_map))
+
+    if not found:
+        output.write(b"Main not found\n")
+    else:
+        output.write(b"Done!\n")
+
+    output.flush()
 
 
 if __name__ == "__main__":
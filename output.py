@@ -0,0 +1,67 @@
+import sys
+
+
+class StringPool:
+    """Encoded puts strings, each stored once and ready to be written."""
+
+    __slots__ = ("strings", "indices")
+
+    def __init__(self):
+        self.strings = []
+        self.indices = dict()
+
+    def add(self, string):
+        i = self.indices.get(string)
+        if i is None:
+            i = len(self.strings)
+            self.indices[string] = i
+            self.strings.append(f"{string}\n".encode())
+
+        return i
+
+
+class Output:
+    """Program and trace output, collected in a byte buffer.
+
+    The buffer is written to `stream` whenever it grows past `limit` bytes.
+    With `capture` everything is kept in memory instead and is available
+    through `getvalue`.
+    """
+
+    __slots__ = ("stream", "buffer", "limit", "capture")
+
+    def __init__(self, stream=None, limit=1 << 16, capture=False):
+        if stream is None and not capture:
+            stream = sys.stdout.buffer
+
+        self.stream = stream
+        self.buffer = bytearray()
+        self.limit = limit
+        self.capture = capture
+
+    def write(self, data):
+        buffer = self.buffer
+        buffer += data
+        if len(buffer) >= self.limit and not self.capture:
+            self.flush()
+
+    def write_text(self, string):
+        self.write(string.encode())
+
+    def putw(self, value):
+        # Formatted like print(value), so booleans stay True and False
+        if type(value) is int:
+            self.write(b"%d\n" % value)
+        else:
+            self.write(str(value).encode() + b"\n")
+
+    def flush(self):
+        if self.capture:
+            return
+
+        self.stream.write(self.buffer)
+        self.stream.flush()
+        self.buffer.clear()
+
+    def getvalue(self):
+        return bytes(self.buffer)
@@ -0,0 +1,145 @@
+import array
+import concurrent.futures
+import contextlib
+import io
+import mmap
+import os
+import re
+import sys
+
+import c_lex
+import c_scan
+
+# Characters lexed by each worker at least, smaller texts are lexed in place
+CHUNK_SIZE = 1 << 22
+
+# Everything from a token boundary up to the next comment: runs of other
+# characters, string literals, and the quotes and slashes that start neither.
+# String literals never span lines, so outside comments every newline ends a
+# token. The groups are atomic so that no backtracking finds a comment inside
+# a string literal
+COMMENT_START = r'(?>[^"/]+|"(?:[^"\\\n]|\\.)*"|"|/(?!\*))*+/\*'
+TEXT_COMMENT_START = re.compile(COMMENT_START)
+BYTES_COMMENT_START = re.compile(COMMENT_START.encode())
+
+
+def comment_after(data, pos, comment_start, close):
+    # [start, end) of the first comment from the token boundary `pos`, or None
+    # if there is none. Without a closing `*/` the opening is lexed as tokens
+    m = comment_start.match(data, pos)
+    if m is None:
+        return None
+
+    end = data.find(close, m.end())
+    if end == -1:
+        return None
+    return m.end() - 2, end + len(close)
+
+
+def cut_points(text, parts):
+    # Offsets that split a str or Source into about `parts` chunks of even
+    # size, each just after a newline outside of comments, so that no token
+    # is cut and each chunk can be lexed on its own
+    data, comment_start, newline, close = text, TEXT_COMMENT_START, "\n", "*/"
+    if isinstance(text, c_lex.Source):
+        data, comment_start = text.data, BYTES_COMMENT_START
+        newline, close = b"\n", b"*/"
+
+    cuts = []
+    comment = comment_after(data, 0, comment_start, close)
+    pos = 0
+    for part in range(1, parts):
+        pos = max(len(data) * part // parts, pos)
+        while True:
+            pos = data.find(newline, pos)
+            if pos == -1:
+                return cuts
+
+            while comment is not None and comment[1] <= pos:
+                comment = comment_after(data, comment[1], comment_start, close)
+            if comment is None or pos < comment[0]:
+                break
+            # The newline is inside a comment
+            pos = comment[1]
+
+        pos += 1
+        if pos == len(data):
+            return cuts
+        cuts.append(pos)
+
+    return cuts
+
+
+def shifted(text, start, end, base, offset):
+    # Tokens of [start, end) of a str or Source that lies at `base` of the
+    # whole text, with offsets into the whole text of array type `offset`,
+    # and what was printed about illegal characters
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        if isinstance(text, c_lex.Source):
+            tokens = c_scan.tokenize(text, start, end)
+        else:
+            tokens = c_scan.tokenize(text)
+
+    shift = base.__add__
+    starts = array.array(offset, map(shift, tokens.starts))
+    ends = array.array(offset, map(shift, tokens.ends))
+    return tokens.types, starts, ends, output.getvalue()
+
+
+def tokenize_chunk(text, start, offset):
+    # Tokens of a chunk copied from `start` of the whole text
+    return shifted(text, 0, None, start, offset)
+
+
+def tokenize_range(path, start, end, offset):
+    # Tokens of [start, end) of the file at `path`. Only the pages of the
+    # range are mapped, so the source is never copied between processes
+    base = start - start % mmap.ALLOCATIONGRANULARITY
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), end - base, offset=base, access=mmap.ACCESS_READ)
+    return shifted(c_lex.Source(data), start - base, end - base, base, offset)
+
+
+def jobs(text, parts, offset):
+    # The chunks cut_points splits a str or Source into, as a lexing function
+    # and the arguments of each call. A mapped Source is passed by path and
+    # range, anything else by a copy of each chunk
+    bounds = [0] + cut_points(text, parts) + [len(text)]
+    pairs = [(a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+    if isinstance(text, c_lex.Source) and text.path is not None:
+        return tokenize_range, [(text.path, a, b, offset) for a, b in pairs]
+
+    if isinstance(text, c_lex.Source):
+        chunks = [c_lex.Source(text.data[a:b]) for a, b in pairs]
+    else:
+        chunks = [text[a:b] for a, b in pairs]
+    return tokenize_chunk, [(c, a, offset) for c, (a, _) in zip(chunks, pairs)]
+
+
+def join(tokens, results):
+    # Adds the results of the lexing functions to Tokens in order
+    for types, starts, ends, output in results:
+        sys.stdout.write(output)
+        tokens.types.extend(types)
+        tokens.starts.extend(starts)
+        tokens.ends.extend(ends)
+    return tokens
+
+
+def tokenize(text, workers=None, chunk_size=CHUNK_SIZE):
+    # The same tokens as c_scan.tokenize, lexed by a pool of `workers`
+    # processes, by default one per CPU, in chunks of at least `chunk_size`
+    # characters
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, len(text) // max(chunk_size, 1))
+    if parts < 2:
+        return c_scan.tokenize(text)
+
+    tokens = c_lex.Tokens(text)
+    function, arguments = jobs(text, parts, tokens.starts.typecode)
+    if len(arguments) < 2:
+        return c_scan.tokenize(text)
+
+    with concurrent.futures.ProcessPoolExecutor(len(arguments)) as pool:
+        return join(tokens, pool.map(function, *zip(*arguments)))
@@ -0,0 +1,455 @@
+"""Generate a standalone parser module from the c_yacc grammar.
+
+The LALR tables are written as dense integer arrays indexed by integer
+token codes, and the body of every grammar action is specialised for each
+of its productions and inlined as a function of the popped values. The
+generated module needs no grammar analysis when imported.
+
+    python parsergen.py [--output c_lalr.py] [--check]
+"""
+
+import argparse
+import ast
+import builtins
+import inspect
+import sys
+import textwrap
+import types
+
+import c_lex
+import c_yacc
+
+DEFAULT_OUTPUT = "c_lalr.py"
+
+# Parsing loop of the generated module
+RUNTIME = '''
+def syntax_error(tokens, i):
+    if i >= len(tokens):
+        return ParseError("Syntax error at end of input")
+
+    name = TOKENS[tokens.types[i]]
+    return ParseError(
+        f"Syntax error at line {tokens.lineno(i)}, token={name} {tokens.value(i)!r}"
+    )
+
+
+def parse(text, tracking=False):
+    # `tracking` is a span table to record node offsets in, see spans.Spans
+    return parse_tokens(c_scan.tokenize(text), tracking)
+
+
+def parse_tokens(tokens, tracking=False):
+    # `tokens` is a c_lex.Tokens, whose type codes are the token codes here
+    if tracking:
+        return parse_tracked(tokens, tracking)
+
+    text = tokens.text
+    # A list indexes faster than an array, and small codes are not copied
+    codes = tokens.types.tolist()
+    codes.append(END)
+    starts = tokens.starts
+    ends = tokens.ends
+
+    action = ACTION
+    goto = GOTO
+    valued = VALUED
+    rules = RULES
+
+    states = [0]
+    values = [None]
+    state = 0
+    i = 0
+    code = codes[0]
+
+    while True:
+        a = action[state * N_TERMINALS + code]
+        if a > 0:
+            if a == ACCEPT:
+                return values[-1]
+
+            state = a
+            states.append(state)
+            # Other tokens are not sliced out of the text
+            values.append(text[starts[i] : ends[i]] if valued[state] else None)
+
+            i += 1
+            code = codes[i]
+        elif a < 0:
+            lhs, length, reduce = rules[-a]
+            if length == 1:
+                # Most reductions, done in place
+                values[-1] = reduce(values[-1])
+                state = goto[states[-2] * N_NONTERMINALS + lhs]
+                states[-1] = state
+                continue
+
+            if length:
+                result = reduce(*values[-length:])
+                del values[-length:]
+                del states[-length:]
+            else:
+                result = reduce()
+
+            state = goto[states[-1] * N_NONTERMINALS + lhs]
+            states.append(state)
+            values.append(result)
+        else:
+            raise syntax_error(tokens, i)
+
+
+def parse_tracked(tokens, spans):
+    # The untracked loop with the [start, end) offsets of every symbol kept
+    # on two more stacks
+    text = tokens.text
+    codes = tokens.types.tolist()
+    codes.append(END)
+    token_starts = tokens.starts
+    token_ends = tokens.ends
+
+    action = ACTION
+    goto = GOTO
+    valued = VALUED
+    rules = RULES
+
+    states = [0]
+    values = [None]
+    starts = [0]
+    ends = [0]
+    state = 0
+    i = 0
+    code = codes[0]
+
+    while True:
+        a = action[state * N_TERMINALS + code]
+        if a > 0:
+            if a == ACCEPT:
+                return values[-1]
+
+            state = a
+            start = token_starts[i]
+            end = token_ends[i]
+            states.append(state)
+            values.append(text[start:end] if valued[state] else None)
+            starts.append(start)
+            ends.append(end)
+
+            i += 1
+            code = codes[i]
+        elif a < 0:
+            lhs, length, reduce = rules[-a]
+            if length:
+                result = reduce(*values[-length:])
+                start = starts[-length]
+                end = ends[-1]
+                del values[-length:]
+                del states[-length:]
+                del starts[-length:]
+                del ends[-length:]
+            else:
+                result = reduce()
+                start = end = ends[-1]
+            spans.add(result, start, end)
+
+            state = goto[states[-1] * N_NONTERMINALS + lhs]
+            states.append(state)
+            values.append(result)
+            starts.append(start)
+            ends.append(end)
+        else:
+            raise syntax_error(tokens, i)
+
+
+class Parser:
+    """Same interface as the other parser engines."""
+
+    __slots__ = ()
+
+    def parse(self, text, tracking=False):
+        return parse(text, tracking)
+
+    def parse_tokens(self, tokens, tracking=False):
+        return parse_tokens(tokens, tracking)
+'''
+
+
+class Unsupported(Exception):
+    pass
+
+
+class Specialise(ast.NodeTransformer):
+    """Rewrites a p_* function body for one of its productions.
+
+    `t[0]` becomes `result`, `t[i]` the i-th parameter, `len(t)` a constant,
+    and branches on constants are resolved.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.globals = set()
+        # Positions of the production whose values are used
+        self.used = set()
+
+    def visit_Subscript(self, node):
+        if isinstance(node.value, ast.Name) and node.value.id == "t":
+            index = node.slice
+            if not isinstance(index, ast.Constant) or not isinstance(index.value, int):
+                raise Unsupported("non constant index into the production")
+            if index.value == 0:
+                return ast.copy_location(ast.Name("result", node.ctx), node)
+            if not 0 < index.value <= self.length:
+                raise Unsupported(f"t[{index.value}] out of range")
+            self.used.add(index.value)
+            return ast.copy_location(ast.Name(f"s{index.value}", node.ctx), node)
+
+        return self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if (
+            isinstance(node.func, ast.Name)
+            and node.func.id == "len"
+            and len(node.args) == 1
+            and isinstance(node.args[0], ast.Name)
+            and node.args[0].id == "t"
+        ):
+            return ast.copy_location(ast.Constant(self.length + 1), node)
+
+        return self.generic_visit(node)
+
+    def visit_Name(self, node):
+        if node.id == "t":
+            raise Unsupported("the production object is used directly")
+        if isinstance(node.ctx, ast.Load):
+            self.globals.add(node.id)
+        return node
+
+    def visit_If(self, node):
+        # The branch not taken may index past the end of the production, so
+        # it is dropped before being visited
+        node.test = self.visit(node.test)
+        taken = fold_compare(node.test)
+        if taken is None:
+            return self.generic_visit(node)
+
+        statements = []
+        for statement in node.body if taken else node.orelse:
+            new = self.visit(statement)
+            if new is not None:
+                statements += new if isinstance(new, list) else [new]
+        return statements or None
+
+
+def fold_compare(test):
+    # Only `constant <op> constant`, the shape `len(t) == n` turns into
+    if not (
+        isinstance(test, ast.Compare)
+        and len(test.ops) == 1
+        and isinstance(test.left, ast.Constant)
+        and isinstance(test.comparators[0], ast.Constant)
+    ):
+        return None
+
+    code = compile(ast.Expression(test), "<fold>", "eval")
+    return eval(code)
+
+
+def rule_source(name, production):
+    tree = ast.parse(textwrap.dedent(inspect.getsource(production.callable)))
+    function = tree.body[0]
+
+    body = function.body
+    if (
+        body
+        and isinstance(body[0], ast.Expr)
+        and isinstance(body[0].value, ast.Constant)
+    ):
+        body = body[1:]
+
+    specialise = Specialise(production.len)
+    statements = []
+    for statement in body:
+        new = specialise.visit(statement)
+        if new is None:
+            continue
+        statements += new if isinstance(new, list) else [new]
+    statements.append(ast.Return(ast.Name("result", ast.Load())))
+
+    arguments = [ast.arg(f"s{i}") for i in range(1, production.len + 1)]
+    function = ast.FunctionDef(
+        name=name,
+        args=ast.arguments(
+            posonlyargs=[], args=arguments, kwonlyargs=[], kw_defaults=[], defaults=[]
+        ),
+        body=statements,
+        decorator_list=[],
+        returns=None,
+        type_params=[],
+    )
+    function = ast.fix_missing_locations(function)
+
+    local_names = {f"s{i}" for i in range(1, production.len + 1)} | {"result"}
+    for node in ast.walk(function):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            local_names.add(node.id)
+
+    return ast.unparse(function), specialise.globals - local_names, specialise.used
+
+
+def imports_for(names, module):
+    out = []
+    for name in sorted(names):
+        if hasattr(builtins, name):
+            continue
+
+        value = getattr(module, name, None)
+        if not isinstance(value, types.ModuleType):
+            raise Unsupported(f"grammar actions use {name!r}, which is not a module")
+
+        if value.__name__ == name:
+            out.append(f"import {name}")
+        else:
+            out.append(f"import {value.__name__} as {name}")
+
+    return out
+
+
+def tuple_source(name, values, per_line=20):
+    out = [f"{name} = ("]
+    for i in range(0, len(values), per_line):
+        out.append("    " + " ".join(f"{v!r}," for v in values[i : i + per_line]))
+    out.append(")")
+    return "\n".join(out)
+
+
+def generate():
+    parser = c_yacc.get_parser()
+    productions = parser.productions
+
+    # Token codes are those of c_lex, so the parser reads c_lex.Tokens as is
+    terminals = list(c_lex.tokens) + ["$end"]
+    if list(c_yacc.tokens) != list(c_lex.tokens):
+        raise Unsupported("the grammar tokens are not those of c_lex")
+    token_codes = {name: i for i, name in enumerate(terminals)}
+
+    nonterminals = []
+    for p in productions[1:]:
+        if p.name not in nonterminals:
+            nonterminals.append(p.name)
+    nonterminal_codes = {name: i for i, name in enumerate(nonterminals)}
+
+    n_states = len(parser.action.base)
+    # Shifts are state numbers and reductions negated rule numbers, so both
+    # 0 and any value past the last state are free for errors and accepting
+    error = 0
+    accept = n_states
+
+    action = [error] * (n_states * len(terminals))
+    for state in range(n_states):
+        for code, a in parser.action.row(state).items():
+            name = parser.terminals[code]
+            action[state * len(terminals) + token_codes[name]] = a if a else accept
+
+    goto = [0] * (n_states * len(nonterminals))
+    for state in range(len(parser.goto.base)):
+        for code, target in parser.goto.row(state).items():
+            name = parser.nonterminals[code]
+            goto[state * len(nonterminals) + nonterminal_codes[name]] = target
+
+    rules = []
+    functions = []
+    used = set()
+    valued_tokens = set()
+    for i, p in enumerate(productions):
+        if i == 0:
+            rules.append("    None,")
+            continue
+
+        source, names, positions = rule_source(f"rule_{i}", p)
+        used |= names
+        symbols = p.str.split("->")[1].split()
+        valued_tokens |= {symbols[j - 1] for j in positions} & token_codes.keys()
+        functions.append(f"# {p.str}\n{source}")
+        rules.append(f"    ({nonterminal_codes[p.name]}, {p.len}, rule_{i}),")
+
+    # Every state is entered by a single symbol, so whether the value of a
+    # shifted token is used only depends on the state shifted to
+    valued = [0] * n_states
+    for state in range(n_states):
+        for name in valued_tokens:
+            a = action[state * len(terminals) + token_codes[name]]
+            if 0 < a < accept:
+                valued[a] = 1
+
+    out = [
+        "# Generated by parsergen.py from the c_yacc grammar; do not edit.",
+        "",
+        *imports_for(used, c_yacc),
+        "import c_scan",
+        "from c_lex import ParseError",
+        "",
+        tuple_source("TOKENS", terminals, per_line=6),
+        "TOKEN_CODES = {name: i for i, name in enumerate(TOKENS)}",
+        tuple_source("NONTERMINALS", nonterminals, per_line=4),
+        "",
+        f"N_TERMINALS = {len(terminals)}",
+        f"N_NONTERMINALS = {len(nonterminals)}",
+        f"END = {token_codes['$end']}",
+        f"ACCEPT = {accept}",
+        "",
+        "# Indexed by state * N_TERMINALS + token code: a state to shift to, a",
+        "# negated rule to reduce by, ACCEPT, or 0 for a syntax error",
+        tuple_source("ACTION", action),
+        "",
+        "# Indexed by state * N_NONTERMINALS + nonterminal code",
+        tuple_source("GOTO", goto),
+        "",
+        "# Whether the state is entered by shifting a token whose value is used:",
+        f"# {', '.join(sorted(valued_tokens))}",
+        tuple_source("VALUED", valued),
+        "",
+        "",
+        "\n\n\n".join(functions),
+        "",
+        "",
+        "# (nonterminal code, length, action) of each rule",
+        "RULES = (",
+        *rules,
+        ")",
+        "",
+        RUNTIME,
+    ]
+
+    return "\n".join(out)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Generate a standalone parser module for the c_yacc grammar"
+    )
+    arg_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    arg_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error if the output is not up to date instead of writing",
+    )
+    args = arg_parser.parse_args()
+
+    source = generate()
+
+    if args.check:
+        try:
+            with open(args.output) as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+
+        if current != source:
+            print(f"{args.output} is out of date", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    with open(args.output, "w") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main()
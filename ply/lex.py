@@ -121,6 +121,8 @@ class Lexer:
 
     def clone(self, object=None):
         c = copy.copy(self)
+        # The clone pushes and pops lexer states on a stack of its own
+        c.lexstatestack = list(self.lexstatestack)
 
         # If the object parameter has been supplied, it means we are attaching the
         # lexer to a new object.  In this case, we have to rebind all methods in
@@ -65,6 +65,11 @@ import re
 import types
 import sys
 import inspect
+import array
+import copy
+import hashlib
+import os
+import pickle
 
 #-----------------------------------------------------------------------------
 #                     === User configurable parameters ===
@@ -76,6 +81,7 @@ yaccdebug   = False            # Debugging mode.  If set, yacc generates a
                                # a 'parser.out' file in the current directory
 
 debug_file  = 'parser.out'     # Default name of the debugging file
+tab_version = '2022.1-cache2'  # Version of the table cache format
 error_count = 3                # Number of symbols that must be shifted to leave recovery mode
 resultlimit = 40               # Size limit of results when running in debug mode.
 
@@ -160,6 +166,19 @@ class YaccSymbol:
     def __repr__(self):
         return str(self)
 
+# Offset just past a symbol when tracking into a span table.  Tokens only know
+# where they start, and the bottom of the stack has no position at all.
+def symbol_end(sym):
+    end = getattr(sym, 'endlexpos', None)
+    if end is not None:
+        return end
+    lexpos = getattr(sym, 'lexpos', None)
+    if lexpos is None:
+        return 0
+    if isinstance(sym.value, str):
+        return lexpos + len(sym.value)
+    return lexpos
+
 # This class is a wrapper around the objects actually passed to each
 # grammar rule.   Index lookup and assignment actually assign the
 # .value attribute of the underlying YaccSymbol object.
@@ -224,15 +243,127 @@ class YaccProduction:
 # The LR Parsing engine.
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+# PackedTable
+#
+# The action and goto tables are sparse rows of small integers.  They are kept
+# row-displaced (a comb vector): every row is laid over one shared array at an
+# offset where its entries land on free slots, and a parallel check array records
+# which row owns each slot.  A lookup is then two array reads and a compare.
+# -----------------------------------------------------------------------------
+
+class PackedTable(object):
+    def __init__(self, rows, n_columns):
+        # rows maps a row number to a dict of column code -> value
+        n_rows = max(rows) + 1 if rows else 0
+        self.n_columns = n_columns
+        self.base = array.array('i', [0] * n_rows)
+        self.value = array.array('i')
+        self.check = array.array('i')
+
+        # Densest rows first, each at the first offset where it fits
+        free = 0
+        for r in sorted(rows, key=lambda r: -len(rows[r])):
+            columns = sorted(rows[r])
+            if not columns:
+                continue
+            while free < len(self.check) and self.check[free] != -1:
+                free += 1
+            offset = max(free - columns[0], 0)
+            while not self._fits(offset, columns):
+                offset += 1
+
+            end = offset + columns[-1] + 1
+            if end > len(self.check):
+                grow = end - len(self.check)
+                self.check.extend([-1] * grow)
+                self.value.extend([0] * grow)
+            for c in columns:
+                self.check[offset + c] = r
+                self.value[offset + c] = rows[r][c]
+            self.base[r] = offset
+
+        # Room for any column past the last row, so lookups never overrun
+        self.check.extend([-1] * (n_columns + 1))
+        self.value.extend([0] * (n_columns + 1))
+
+    def _fits(self, offset, columns):
+        check = self.check
+        for c in columns:
+            i = offset + c
+            if i < len(check) and check[i] != -1:
+                return False
+        return True
+
+    def get(self, row, column, default=None):
+        i = self.base[row] + column
+        if self.check[i] == row:
+            return self.value[i]
+        return default
+
+    def row(self, row):
+        return {c: self.value[self.base[row] + c] for c in range(self.n_columns)
+                if self.check[self.base[row] + c] == row}
+
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.base, self.value, self.check))
+
+# Integer coded tables of an LRTable.  Terminals and nonterminals are numbered
+# so that the packed tables can be indexed by integers.  An unknown token type
+# gets a code of its own that has no actions.
+class LRPackedTables(object):
+    def __init__(self, action, goto, productions):
+        self.terminals = sorted(set(t for row in action.values() for t in row))
+        self.nonterminals = sorted(set(p.name for p in productions))
+        tc = {t: i for i, t in enumerate(self.terminals)}
+        nc = {n: i for i, n in enumerate(self.nonterminals)}
+
+        self.action = PackedTable(
+            {s: {tc[t]: a for t, a in row.items()} for s, row in action.items()},
+            len(self.terminals) + 1)
+        self.goto = PackedTable(
+            {s: {nc[n]: g for n, g in row.items()} for s, row in goto.items()},
+            len(self.nonterminals))
+
 class LRParser:
     def __init__(self, lrtab, errorf):
         self.productions = lrtab.lr_productions
-        self.action = lrtab.lr_action
-        self.goto = lrtab.lr_goto
         self.errorfunc = errorf
-        self.set_defaulted_states()
         self.errorok = True
 
+        packed = getattr(lrtab, 'lr_packed', None)
+        if packed is None:
+            packed = LRPackedTables(lrtab.lr_action, lrtab.lr_goto, lrtab.lr_productions)
+        self.terminals = packed.terminals
+        self.nonterminals = packed.nonterminals
+        self.action = packed.action
+        self.goto = packed.goto
+
+        self.terminal_codes = {t: i for i, t in enumerate(self.terminals)}
+        self.nonterminal_codes = {n: i for i, n in enumerate(self.nonterminals)}
+        self.unknown_code = len(self.terminals)
+        self.production_codes = [self.nonterminal_codes[p.name] for p in self.productions]
+
+        # Lists of the packed tables for parse(), built once and shared by clones.
+        # Indexing a list is faster than indexing an array, which has to box every
+        # item it returns.
+        self.action_lists = (self.action.base.tolist(), self.action.value.tolist(),
+                             self.action.check.tolist())
+        self.goto_lists = (self.goto.base.tolist(), self.goto.value.tolist())
+
+        self.set_defaulted_states()
+
+    # Next state after reducing to the nonterminal pname in state
+    def goto_state(self, state, pname):
+        return self.goto.get(state, self.nonterminal_codes[pname])
+
+    # A parser that shares the tables of this one.  The stacks of a parse are kept
+    # on the parser, so parsers that run at the same time must be different clones.
+    def clone(self):
+        c = copy.copy(self)
+        c.errorok = True
+        return c
+
     def errok(self):
         self.errorok = True
 
@@ -254,13 +385,20 @@ class LRParser:
     # See:  http://www.gnu.org/software/bison/manual/html_node/Default-Reductions.html#Default-Reductions
     def set_defaulted_states(self):
         self.defaulted_states = {}
-        for state, actions in self.action.items():
-            rules = list(actions.values())
+        for state in range(len(self.action.base)):
+            rules = list(self.action.row(state).values())
             if len(rules) == 1 and rules[0] < 0:
                 self.defaulted_states[state] = rules[0]
+        self.set_defaulted_list()
 
     def disable_defaulted_states(self):
         self.defaulted_states = {}
+        self.set_defaulted_list()
+
+    # The defaulted reduction of every state, or 0, as a list for parse()
+    def set_defaulted_list(self):
+        self.defaulted_list = [self.defaulted_states.get(s, 0)
+                               for s in range(len(self.action.base))]
 
     # parse().
     #
@@ -268,7 +406,9 @@ class LRParser:
     # Two options are provided.  The debug flag turns on debugging so that you can
     # see the various rule reductions and parsing steps.  tracking turns on position
     # tracking.  In this mode, symbols will record the starting/ending line number and
-    # character index.
+    # character index.  tracking may instead be a span table, an object with an
+    # add(value, start, end) method that is given the character offsets of the value
+    # of every reduction.
 
     def parse(self, input=None, lexer=None, debug=False, tracking=False):
         # If debugging has been specified as a flag, turn it into a logging object
@@ -277,10 +417,15 @@ class LRParser:
 
         lookahead = None                         # Current lookahead symbol
         lookaheadstack = []                      # Stack of lookahead symbols
-        actions = self.action                    # Local reference to action table (to avoid lookup on self.)
-        goto    = self.goto                      # Local reference to goto table (to avoid lookup on self.)
+        action_base, action_value, action_check = self.action_lists
+        goto_base, goto_value = self.goto_lists
+        codes   = self.terminal_codes            # Integer code of each token type
+        unknown = self.unknown_code
+        lhs     = self.production_codes          # Integer code of the nonterminal of each production
         prod    = self.productions               # Local reference to production list (to avoid lookup on self.)
-        defaulted_states = self.defaulted_states # Local reference to defaulted states
+        coded   = None                           # Lookahead symbol whose code is lcode
+        lcode   = unknown
+        defaulted_states = self.defaulted_list
         pslice  = YaccProduction(None)           # Production object passed to grammar rules
         errorcount = 0                           # Used during error recovery
 
@@ -324,7 +469,8 @@ class LRParser:
             if debug:
                 debug.debug('State  : %s', state)
 
-            if state not in defaulted_states:
+            t = defaulted_states[state]
+            if not t:
                 if not lookahead:
                     if not lookaheadstack:
                         lookahead = get_token()     # Get the next token
@@ -335,10 +481,12 @@ class LRParser:
                         lookahead.type = '$end'
 
                 # Check the action table
-                ltype = lookahead.type
-                t = actions[state].get(ltype)
+                if lookahead is not coded:
+                    coded = lookahead
+                    lcode = codes.get(lookahead.type, unknown)
+                i = action_base[state] + lcode
+                t = action_value[i] if action_check[i] == state else None
             else:
-                t = defaulted_states[state]
                 if debug:
                     debug.debug('Defaulted state %s: Reduce using %d', state, -t)
 
@@ -378,22 +526,25 @@ class LRParser:
                         if plen:
                             debug.info('Action : Reduce rule [%s] with %s and goto state %d', p.str,
                                        '['+','.join([format_stack_entry(_v.value) for _v in symstack[-plen:]])+']',
-                                       goto[statestack[-1-plen]][pname])
+                                       self.goto_state(statestack[-1-plen], pname))
                         else:
                             debug.info('Action : Reduce rule [%s] with %s and goto state %d', p.str, [],
-                                       goto[statestack[-1]][pname])
+                                       self.goto_state(statestack[-1], pname))
 
                     if plen:
                         targ = symstack[-plen-1:]
                         targ[0] = sym
 
-                        if tracking:
+                        if tracking is True:
                             t1 = targ[1]
                             sym.lineno = t1.lineno
                             sym.lexpos = t1.lexpos
                             t1 = targ[-1]
                             sym.endlineno = getattr(t1, 'endlineno', t1.lineno)
                             sym.endlexpos = getattr(t1, 'endlexpos', t1.lexpos)
+                        elif tracking:
+                            sym.lexpos = targ[1].lexpos
+                            sym.endlexpos = symbol_end(targ[-1])
 
                         # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
                         # The code enclosed in this section is duplicated
@@ -410,8 +561,10 @@ class LRParser:
                             del statestack[-plen:]
                             if debug:
                                 debug.info('Result : %s', format_result(pslice[0]))
+                            if tracking and tracking is not True:
+                                tracking.add(sym.value, sym.lexpos, sym.endlexpos)
                             symstack.append(sym)
-                            state = goto[statestack[-1]][pname]
+                            state = goto_value[goto_base[statestack[-1]] + lhs[-t]]
                             statestack.append(state)
                         except SyntaxError:
                             # If an error was set. Enter error recovery state
@@ -429,9 +582,11 @@ class LRParser:
 
                     else:
 
-                        if tracking:
+                        if tracking is True:
                             sym.lineno = lexer.lineno
                             sym.lexpos = lexer.lexpos
+                        elif tracking:
+                            sym.lexpos = sym.endlexpos = symbol_end(symstack[-1])
 
                         targ = [sym]
 
@@ -448,8 +603,10 @@ class LRParser:
                             p.callable(pslice)
                             if debug:
                                 debug.info('Result : %s', format_result(pslice[0]))
+                            if tracking and tracking is not True:
+                                tracking.add(sym.value, sym.lexpos, sym.endlexpos)
                             symstack.append(sym)
-                            state = goto[statestack[-1]][pname]
+                            state = goto_value[goto_base[statestack[-1]] + lhs[-t]]
                             statestack.append(state)
                         except SyntaxError:
                             # If an error was set. Enter error recovery state
@@ -1929,6 +2086,101 @@ class LRTable:
 # introspection features followed by the yacc() function itself.
 # -----------------------------------------------------------------------------
 
+# -----------------------------------------------------------------------------
+#                          === LR Table Cache ===
+#
+# The tables computed by LRTable can be saved to a file and loaded back the
+# next time the same grammar is built, skipping the table construction.  The
+# file is keyed by a hash of the grammar signature computed by ParserReflect.
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# class MiniProduction:
+#
+# A production loaded from a table cache.  It only holds what the parsing
+# engine needs.
+# -----------------------------------------------------------------------------
+
+class MiniProduction(object):
+    def __init__(self, str, name, len, func, file, line):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.file     = file
+        self.line     = line
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return 'MiniProduction(%s)' % self.str
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
+# -----------------------------------------------------------------------------
+# class LRCachedTable:
+#
+# Parsing tables read back from a table cache.  It has the attributes of
+# LRTable that LRParser uses.
+# -----------------------------------------------------------------------------
+
+class LRCachedTable(object):
+    def __init__(self, packed, productions):
+        self.lr_packed      = packed
+        self.lr_productions = productions
+        self.sr_conflicts   = []
+        self.rr_conflicts   = []
+
+    # Bind all production function names to callable objects in pdict
+    def bind_callables(self, pdict):
+        for p in self.lr_productions:
+            p.bind(pdict)
+
+def signature_hash(signature):
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()
+
+# Write the tables of lr to tabfile, tagged with the grammar signature
+def write_tables(lr, signature, tabfile):
+    data = {
+        'version': tab_version,
+        'signature': signature_hash(signature),
+        'packed': lr.lr_packed,
+        'productions': [(p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line)
+                        for p in lr.lr_productions],
+    }
+
+    dirname = os.path.dirname(tabfile)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+
+    # Written to a temporary file first so that readers never see a partial cache
+    tmpfile = '%s.%d.tmp' % (tabfile, os.getpid())
+    with open(tmpfile, 'wb') as f:
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpfile, tabfile)
+
+# Read the tables saved in tabfile.  Returns None if the file is missing, is
+# from another version or was built for a different grammar.
+def read_tables(signature, tabfile):
+    try:
+        with open(tabfile, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+
+    if not isinstance(data, dict):
+        return None
+    if data.get('version') != tab_version or data.get('signature') != signature_hash(signature):
+        return None
+
+    productions = [MiniProduction(*p) for p in data['productions']]
+    return LRCachedTable(data['packed'], productions)
+
 # -----------------------------------------------------------------------------
 # get_caller_module_dict()
 #
@@ -2033,7 +2285,9 @@ class ParserReflect(object):
                 parts.append(''.join([''.join(p) for p in self.prec]))
             if self.tokens:
                 parts.append(' '.join(self.tokens))
+            # The table cache stores the action names along with the rules
             for f in self.pfuncs:
+                parts.append(f[2])
                 if f[3]:
                     parts.append(f[3])
         except (TypeError, ValueError):
@@ -2270,7 +2524,7 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, tabfile=None):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2303,6 +2557,21 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
     if pinfo.error:
         raise YaccError('Unable to build parser')
 
+    # Reuse the tables of a previous build of the same grammar if possible.
+    # A debug build always rebuilds them to describe them in the debug file
+    if tabfile:
+        signature = pinfo.signature()
+        lr = None if debug else read_tables(signature, tabfile)
+        if lr is not None:
+            if pinfo.validate_all():
+                raise YaccError('Unable to build parser')
+
+            lr.bind_callables(pinfo.pdict)
+            parser = LRParser(lr, pinfo.error_func)
+
+            parse = parser.parse
+            return parser
+
     if debuglog is None:
         if debug:
             try:
@@ -2474,6 +2743,14 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    lr.lr_packed = LRPackedTables(lr.lr_action, lr.lr_goto, lr.lr_productions)
+
+    if tabfile:
+        try:
+            write_tables(lr, signature, tabfile)
+        except OSError as e:
+            errorlog.warning("Couldn't write table cache %r. %s" % (tabfile, e))
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
@@ -0,0 +1,91 @@
+import time
+
+
+class Profile:
+    """Execution counts and call timings collected by the decoded engine."""
+
+    __slots__ = ("counts", "calls", "inclusive", "exclusive", "active", "max_depth")
+
+    def __init__(self, program):
+        # Times each instruction was executed, indexed like program.code
+        self.counts = [0] * len(program.code)
+        self.calls = dict()
+        self.inclusive = dict()
+        self.exclusive = dict()
+        # Activations of each function currently on the call stack
+        self.active = dict()
+        self.max_depth = 0
+
+    def enter(self, function):
+        self.calls[function] = self.calls.get(function, 0) + 1
+        self.active[function] = self.active.get(function, 0) + 1
+
+    def leave(self, function, elapsed, children):
+        self.active[function] -= 1
+        # Recursive activations are already inside the outermost one
+        if self.active[function] == 0:
+            self.inclusive[function] = self.inclusive.get(function, 0) + elapsed
+        self.exclusive[function] = self.exclusive.get(function, 0) + elapsed - children
+
+    def report(self, program, source_map=None, top=20):
+        code = program.code
+        out = []
+
+        out.append(f"Instructions executed: {sum(self.counts)}")
+        out.append(f"Maximum call depth: {self.max_depth}")
+
+        out.append("")
+        out.append("Functions:")
+        out.append(f"{'calls':>10} {'inclusive':>12} {'exclusive':>12}  label")
+        for f in sorted(self.calls, key=lambda f: -self.exclusive.get(f, 0)):
+            out.append(
+                f"{self.calls[f]:>10} {self.inclusive.get(f, 0):>12.6f} "
+                f"{self.exclusive.get(f, 0):>12.6f}  {f.label}"
+            )
+
+        out.append("")
+        out.append("Labels:")
+        out.append(f"{'count':>10}  label")
+        for i, cl in enumerate(code):
+            if cl[0] == ":" and self.counts[i]:
+                out.append(f"{self.counts[i]:>10}  {cl}")
+
+        out.append("")
+        out.append("Hottest lines:")
+        out.append(f"{'count':>10} {'line':>6}  {'origin':<24} instruction")
+        hot = sorted(range(len(code)), key=lambda i: -self.counts[i])[:top]
+        for i in hot:
+            if not self.counts[i]:
+                break
+            # The instruction entering main is added by the loader, past the
+            # lines the source map covers
+            origin = "?"
+            if source_map is not None and i < len(source_map):
+                origin = source_map[i]
+            out.append(f"{self.counts[i]:>10} {i + 1:>6}  {origin:<24} {code[i]}")
+
+        return "\n".join(out) + "\n"
+
+
+class CallTimer:
+    """Pairs fcall/return instructions to time every activation."""
+
+    __slots__ = ("profile", "stack")
+
+    def __init__(self, profile):
+        self.profile = profile
+        # [function, start time, time spent in callees] per activation
+        self.stack = []
+
+    def call(self, function):
+        self.profile.enter(function)
+        self.stack.append([function, time.perf_counter(), 0.0])
+        if len(self.stack) > self.profile.max_depth:
+            self.profile.max_depth = len(self.stack)
+
+    def ret(self):
+        function, start, children = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        self.profile.leave(function, elapsed, children)
+        if self.stack:
+            self.stack[-1][2] += elapsed
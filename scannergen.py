@@ -0,0 +1,475 @@
+"""Generate a table-driven scanner module from the c_lex token rules.
+
+The t_* patterns, the blanks of t_ignore and the reserved words are compiled
+into one DFA over bytes, which is minimized and written as transition tables
+over byte classes. As with patterns compiled for bytes, \\w and \\d only take
+ASCII characters. Reserved words are recognized by the DFA itself, with
+priority over identifiers. Matches are the longest, ties go to the rule ply
+tries first, and a rule with a lazy quantifier ends at its shortest match.
+
+    python scannergen.py [--output c_scan.py] [--check]
+"""
+
+import argparse
+import string
+import sys
+
+import c_lex
+from parsergen import tuple_source
+
+DEFAULT_OUTPUT = "c_scan.py"
+
+ALPHABET = range(256)
+DIGITS = frozenset(map(ord, string.digits))
+WORD = frozenset(map(ord, string.ascii_letters + string.digits + "_"))
+NEWLINE = ord("\n")
+
+# Bytes of a Source scanned at a time
+WINDOW = 1 << 20
+
+# Accept values other than token codes
+NO_TOKEN = 255
+SKIP = 254
+
+# Scanning loop of the generated module
+RUNTIME = """
+def scan(classes, base, final, tokens):
+    # Adds the tokens of `classes`, the character classes of the text from
+    # offset `base` on. Unless `final`, a match running into the end of
+    # `classes` may continue past it, so scanning stops before that token.
+    # Returns the offset scanning stopped at
+    add_type = tokens.types.append
+    add_start = tokens.starts.append
+    add_end = tokens.ends.append
+    delta = DELTA
+    accepts = ACCEPTS
+
+    n = len(classes)
+    pos = 0
+    while pos < n:
+        # Longest match from pos
+        state = START
+        i = pos
+        end = -1
+        while i < n:
+            state = delta[state][classes[i]]
+            if not state:
+                break
+            i += 1
+            if accepts[state] != NO_TOKEN:
+                end = i
+                code = accepts[state]
+
+        if state and not final:
+            break
+
+        if end < 0:
+            pos = c_lex.skip_illegal(tokens.text, base + pos) - base
+            continue
+
+        if code != SKIP:
+            add_type(code)
+            add_start(base + pos)
+            add_end(base + end)
+        pos = end
+
+    return base + pos
+
+
+def tokenize(text, start=0, end=None):
+    # The same tokens as c_lex.tokenize. A Source is scanned in windows of
+    # its bytes, so no decoded copy of it is made, and only the bytes from
+    # `start` to `end` if given. The tables see bytes, so a str that is not
+    # ASCII is left to the regex scanner
+    tokens = c_lex.Tokens(text)
+    if not isinstance(text, c_lex.Source):
+        if not text.isascii():
+            return c_lex.tokenize(text)
+        scan(text.encode("ascii").translate(CLASSES), 0, True, tokens)
+        return tokens
+
+    data = text.data
+    end = len(data) if end is None else end
+    window = WINDOW
+    pos = start
+    while True:
+        classes = data[pos : min(pos + window, end)].translate(CLASSES)
+        final = pos + len(classes) >= end
+        scanned = scan(classes, pos, final, tokens)
+        if final:
+            return tokens
+
+        if scanned == pos:
+            # A token longer than the window
+            window *= 2
+        pos = scanned
+"""
+
+
+class Unsupported(Exception):
+    pass
+
+
+class NFA:
+    """Thompson automaton, states are indices into `edges` and `epsilons`."""
+
+    __slots__ = ("edges", "epsilons")
+
+    def __init__(self):
+        self.edges = []
+        self.epsilons = []
+
+    def state(self):
+        self.edges.append([])
+        self.epsilons.append([])
+        return len(self.edges) - 1
+
+    def fragment(self, chars):
+        start = self.state()
+        end = self.state()
+        self.edges[start].append((chars, end))
+        return start, end
+
+
+class Pattern:
+    """Parses the regex syntax used by c_lex into fragments of an NFA."""
+
+    __slots__ = ("nfa", "text", "pos", "lazy")
+
+    def __init__(self, nfa, text):
+        self.nfa = nfa
+        self.text = text
+        self.pos = 0
+        self.lazy = False
+
+    def parse(self):
+        fragment = self.alternation()
+        if self.pos != len(self.text):
+            raise Unsupported(f"unexpected {self.text[self.pos]!r} in {self.text!r}")
+        return fragment
+
+    def peek(self):
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+    def take(self):
+        char = self.text[self.pos]
+        self.pos += 1
+        return char
+
+    def alternation(self):
+        fragments = [self.sequence()]
+        while self.peek() == "|":
+            self.pos += 1
+            fragments.append(self.sequence())
+        if len(fragments) == 1:
+            return fragments[0]
+
+        nfa = self.nfa
+        start = nfa.state()
+        end = nfa.state()
+        for s, e in fragments:
+            nfa.epsilons[start].append(s)
+            nfa.epsilons[e].append(end)
+        return start, end
+
+    def sequence(self):
+        nfa = self.nfa
+        start = end = nfa.state()
+        while self.peek() not in (None, "|", ")"):
+            s, e = self.repeat()
+            nfa.epsilons[end].append(s)
+            end = e
+        return start, end
+
+    def repeat(self):
+        nfa = self.nfa
+        s, e = self.atom()
+        while self.peek() in ("*", "+", "?"):
+            op = self.take()
+            if self.peek() == "?":
+                self.pos += 1
+                self.lazy = True
+
+            start = nfa.state()
+            end = nfa.state()
+            nfa.epsilons[start].append(s)
+            nfa.epsilons[e].append(end)
+            if op != "+":
+                nfa.epsilons[start].append(end)
+            if op != "?":
+                nfa.epsilons[e].append(s)
+            s, e = start, end
+        return s, e
+
+    def atom(self):
+        char = self.take()
+        if char == "(":
+            if self.text.startswith("?:", self.pos):
+                self.pos += 2
+            fragment = self.alternation()
+            if self.peek() != ")":
+                raise Unsupported(f"unbalanced parenthesis in {self.text!r}")
+            self.pos += 1
+            return fragment
+        elif char == "[":
+            return self.nfa.fragment(self.char_class())
+        elif char == ".":
+            return self.nfa.fragment(frozenset(ALPHABET) - {NEWLINE})
+        elif char == "\\":
+            return self.nfa.fragment(self.escape())
+        elif char in "*+?{}^$":
+            raise Unsupported(f"{char!r} is not supported in {self.text!r}")
+
+        return self.nfa.fragment(frozenset([ord(char)]))
+
+    def escape(self):
+        char = self.take()
+        if char == "d":
+            return DIGITS
+        elif char == "w":
+            return WORD
+        elif char == "n":
+            return frozenset([NEWLINE])
+        elif char == "t":
+            return frozenset([ord("\t")])
+        elif char.isalnum():
+            raise Unsupported(f"escape \\{char} is not supported in {self.text!r}")
+        return frozenset([ord(char)])
+
+    def char_class(self):
+        negated = self.peek() == "^"
+        if negated:
+            self.pos += 1
+
+        chars = set()
+        while True:
+            char = self.take()
+            if char == "]":
+                break
+            elif char == "\\":
+                chars |= self.escape()
+            elif self.peek() == "-" and self.text[self.pos + 1] != "]":
+                self.pos += 1
+                chars.update(range(ord(char), ord(self.take()) + 1))
+            else:
+                chars.add(ord(char))
+
+        if negated:
+            return frozenset(ALPHABET) - chars
+        return frozenset(chars)
+
+
+def rules():
+    # (pattern, accept value) in priority order: the reserved words, then the
+    # rules in the order of ply's master regex, then the ignored blanks
+    out = []
+    for word, name in sorted(c_lex.reserved_dict.items()):
+        pattern = "".join(f"[{c.lower()}{c.upper()}]" for c in word)
+        out.append((pattern, c_lex.CODES[name]))
+
+    for rule in c_lex.SCANNER.groupindex:
+        value = getattr(c_lex, rule)
+        pattern = value.__doc__ if callable(value) else value
+        code = c_lex.RULE_CODES[rule]
+        out.append((pattern, SKIP if code is None else code))
+
+    out.append((f"[{c_lex.t_ignore}]+", SKIP))
+    return out
+
+
+def build_nfa():
+    nfa = NFA()
+    start = nfa.state()
+    accepting = dict()  # NFA state -> rule number
+    rule_states = []
+    lazy = set()
+    for i, (pattern, _) in enumerate(rules()):
+        first = len(nfa.edges)
+        p = Pattern(nfa, pattern)
+        s, e = p.parse()
+        nfa.epsilons[start].append(s)
+        accepting[e] = i
+        rule_states.append(range(first, len(nfa.edges)))
+        if p.lazy:
+            lazy.add(i)
+
+    return nfa, start, accepting, rule_states, lazy
+
+
+def closure(nfa, states):
+    out = set(states)
+    stack = list(states)
+    while stack:
+        for t in nfa.epsilons[stack.pop()]:
+            if t not in out:
+                out.add(t)
+                stack.append(t)
+    return out
+
+
+def build_dfa():
+    # Subset construction. Returns the rows of transitions, indexed by char,
+    # and the accept value of each state. State 0 is the dead state and
+    # state 1 the start
+    nfa, start, accepting, rule_states, lazy = build_nfa()
+    values = [v for _, v in rules()]
+
+    def dfa_state(states):
+        states = closure(nfa, states)
+        for i in lazy:
+            # A lazy rule that matched stops there
+            if any(accepting.get(s) == i for s in states):
+                states = {
+                    s for s in states if s not in rule_states[i] or s in accepting
+                }
+        return frozenset(states)
+
+    ids = {frozenset(): 0}
+    order = [frozenset()]
+    first = dfa_state([start])
+    ids[first] = 1
+    order.append(first)
+
+    rows = []
+    accepts = []
+    i = 0
+    while i < len(order):
+        states = order[i]
+        matched = [accepting[s] for s in states if s in accepting]
+        accepts.append(values[min(matched)] if matched else NO_TOKEN)
+
+        row = []
+        for char in ALPHABET:
+            targets = [t for s in states for chars, t in nfa.edges[s] if char in chars]
+            target = dfa_state(targets) if targets else frozenset()
+            if target not in ids:
+                ids[target] = len(order)
+                order.append(target)
+            row.append(ids[target])
+        rows.append(row)
+        i += 1
+
+    return rows, accepts
+
+
+def minimize(rows, accepts):
+    # Moore's partition refinement, starting from the accept values. The
+    # dead state and the start keep the numbers 0 and 1
+    block = list(accepts)
+    block[0] = -1
+    while True:
+        signatures = {}
+        new = []
+        for state, row in enumerate(rows):
+            key = (block[state], tuple(block[t] for t in row))
+            new.append(signatures.setdefault(key, len(signatures)))
+        if len(signatures) == len(set(block)):
+            break
+        block = new
+
+    # Renumbered in order of first appearance from the dead state and start
+    numbers = {}
+    for state in [0, 1] + list(range(2, len(rows))):
+        numbers.setdefault(block[state], len(numbers))
+
+    out_rows = [None] * len(numbers)
+    out_accepts = [None] * len(numbers)
+    for state, row in enumerate(rows):
+        n = numbers[block[state]]
+        out_rows[n] = [numbers[block[t]] for t in row]
+        out_accepts[n] = accepts[state]
+
+    return out_rows, out_accepts
+
+
+def char_classes(rows):
+    # Chars with the same transitions in every state share a class
+    columns = {}
+    classes = []
+    for char in ALPHABET:
+        column = tuple(row[char] for row in rows)
+        classes.append(columns.setdefault(column, len(columns)))
+
+    class_rows = []
+    for row in rows:
+        out = [0] * len(columns)
+        for char in ALPHABET:
+            out[classes[char]] = row[char]
+        class_rows.append(out)
+
+    return classes, class_rows
+
+
+def generate():
+    rows, accepts = minimize(*build_dfa())
+    if len(rows) > 256:
+        raise Unsupported("too many states for a table of bytes")
+    classes, class_rows = char_classes(rows)
+
+    out = [
+        "# Generated by scannergen.py from the c_lex rules; do not edit.",
+        "",
+        "import c_lex",
+        "",
+        f"NO_TOKEN = {NO_TOKEN}",
+        f"SKIP = {SKIP}",
+        "START = 1",
+        f"N_CLASSES = {len(class_rows[0])}",
+        f"WINDOW = {WINDOW}",
+        "",
+        "# Character class of each byte",
+        tuple_source("CLASS_OF", classes, per_line=16),
+        "",
+        "# Indexed by state * N_CLASSES + character class: the next state, or 0",
+        "# once no rule can match",
+        tuple_source("TRANSITIONS", [t for row in class_rows for t in row]),
+        "",
+        "# Token code of the rule matched in each state, SKIP for blanks and",
+        "# comments, or NO_TOKEN",
+        tuple_source("ACCEPTS", accepts),
+        "",
+        "# As bytes, for bytes.translate and indexing without boxing",
+        "CLASSES = bytes(CLASS_OF)",
+        "DELTA = tuple(",
+        "    bytes(TRANSITIONS[i : i + N_CLASSES])",
+        "    for i in range(0, len(TRANSITIONS), N_CLASSES)",
+        ")",
+        "",
+        RUNTIME,
+    ]
+
+    return "\n".join(out)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Generate a table-driven scanner module for the c_lex rules"
+    )
+    arg_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    arg_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="exit with an error if the output is not up to date instead of writing",
+    )
+    args = arg_parser.parse_args()
+
+    source = generate()
+
+    if args.check:
+        try:
+            with open(args.output) as f:
+                current = f.read()
+        except FileNotFoundError:
+            current = None
+
+        if current != source:
+            print(f"{args.output} is out of date", file=sys.stderr)
+            sys.exit(1)
+        return
+
+    with open(args.output, "w") as f:
+        f.write(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import array
+
+import a_code
+import c_lex
+
+
+class Spans:
+    """Source offsets of the AST nodes built while parsing `text`.
+
+    Parsers given a table as `tracking` call `add` with the [start, end)
+    offsets of every value they build. Lines and columns are only worked
+    out when a location is asked for.
+    """
+
+    __slots__ = ("text", "index", "starts", "ends", "lines")
+
+    def __init__(self, text):
+        self.text = text
+        self.index = dict()
+        self.starts = array.array("l")
+        self.ends = array.array("l")
+        self.lines = None
+
+    def add(self, node, start, end):
+        # Lists, tuples and types are built too, but only nodes are kept.
+        # A node that is also the value of an enclosing rule, like a
+        # parenthesized expression, takes the wider span
+        if not isinstance(node, a_code.Node):
+            return
+
+        i = self.index.get(node)
+        if i is None:
+            self.index[node] = len(self.starts)
+            self.starts.append(start)
+            self.ends.append(end)
+        else:
+            self.starts[i] = start
+            self.ends[i] = end
+
+    def span(self, node):
+        i = self.index.get(node)
+        if i is None:
+            return None
+        return self.starts[i], self.ends[i]
+
+    def position(self, offset):
+        # 1-based line and column of an offset into the text
+        if self.lines is None:
+            self.lines = c_lex.Lines(self.text)
+        return self.lines.position(offset)
+
+    def location(self, node):
+        span = self.span(node)
+        if span is None:
+            return None
+
+        line, column = self.position(span[0])
+        return f"{line}:{column}"
@@ -0,0 +1,383 @@
+"""Compact binary TAC images.
+
+Layout, every section aligned to 8 bytes and arrays in native byte order:
+
+    header        HEADER
+    functions     n_functions x (start, end, n_slots, label string) int32
+    constants     n_constants int64 values, then n_constants tag bytes
+    strings       n_strings + 1 uint32 offsets into the blob, then the blob
+    instructions  n_instructions x INSTRUCTION_WORDS int32
+
+An instruction is a head word, `opcode | kind_a << 8 | kind_b << 10 |
+kind_d << 12 | operator << 16`, followed by a destination/target word and
+two operand words. Constant operands are indices into the constant pool.
+Integer constants outside int64 are kept as decimal text in the strings,
+their pool value being the index of the string.
+"""
+
+import array
+import mmap
+import struct
+import sys
+
+from interpret import (
+    LABEL,
+    GOTO,
+    PUTS,
+    PUTW,
+    IF_FALSE,
+    RETURN,
+    RETURN_VALUE,
+    PUSH,
+    POP,
+    FCALL,
+    COPY,
+    NOT,
+    BINARY,
+    ENTER,
+    CONST,
+    LOCAL,
+    GLOBAL,
+    BINARY_HANDLERS,
+    NOT_HANDLERS,
+    OPERATORS,
+    Function,
+)
+from output import Output
+
+MAGIC = b"TACB"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHBx10i")
+INSTRUCTION_WORDS = 4
+
+# Constant tags
+TAG_INT, TAG_BOOL, TAG_BIG_INT = range(3)
+INT64 = range(-(1 << 63), 1 << 63)
+
+OPERATOR_NAMES = list(OPERATORS)
+OPERATOR_CODES = {name: i for i, name in enumerate(OPERATOR_NAMES)}
+
+HANDLER_KEYS = {h: key for key, h in BINARY_HANDLERS.items()}
+NOT_HANDLER_KINDS = {h: kind for kind, h in NOT_HANDLERS.items()}
+
+BYTE_ORDERS = {"little": 0, "big": 1}
+
+
+class FormatError(Exception):
+    pass
+
+
+def padding(size):
+    return b"\0" * (-size % 8)
+
+
+def dump(program, f):
+    functions = sorted(program.functions.values(), key=lambda fn: fn.start)
+    function_index = {fn: i for i, fn in enumerate(functions)}
+
+    constants = []
+    constant_index = dict()
+
+    def constant(value):
+        # Keyed by type too, since True == 1
+        key = (type(value), value)
+        i = constant_index.get(key)
+        if i is None:
+            i = constant_index[key] = len(constants)
+            constants.append(value)
+        return i
+
+    def operand(kind, value):
+        return constant(value) if kind == CONST else value
+
+    strings = list(program.strings)
+    labels_start = len(strings)
+    strings += [fn.label.encode() for fn in functions]
+
+    words = array.array("i")
+    for ins in program.instructions:
+        op = ins[0]
+        kind_a = kind_b = kind_d = operator = 0
+        target = a = b = 0
+
+        if op == GOTO:
+            target = ins[1]
+        elif op == PUTS:
+            target = ins[1]
+        elif op in (PUTW, PUSH, RETURN_VALUE):
+            kind_a, a = ins[1]
+            a = operand(kind_a, a)
+        elif op == IF_FALSE:
+            kind_a, a = ins[1]
+            a = operand(kind_a, a)
+            target = ins[2]
+        elif op == POP:
+            kind_d, target = ins[1]
+        elif op == FCALL or op == ENTER:
+            target = function_index[ins[1]]
+        elif op == COPY:
+            kind_d, target = ins[1]
+            kind_a, a = ins[2]
+            a = operand(kind_a, a)
+        elif op == NOT:
+            kind_d, target = ins[1]
+            kind_a = NOT_HANDLER_KINDS[ins[2]]
+            a = operand(kind_a, ins[3])
+        elif op == BINARY:
+            kind_d, target = ins[1]
+            name, kind_a, kind_b = HANDLER_KEYS[ins[2]]
+            operator = OPERATOR_CODES[name]
+            a = operand(kind_a, ins[3])
+            b = operand(kind_b, ins[4])
+        elif op not in (LABEL, RETURN):
+            raise RuntimeError("Not implemented")
+
+        head = op | kind_a << 8 | kind_b << 10 | kind_d << 12 | operator << 16
+        words.extend((head, target, a, b))
+
+    function_words = array.array("i")
+    for i, fn in enumerate(functions):
+        function_words.extend((fn.start, fn.end, fn.n_slots, labels_start + i))
+
+    constant_values = array.array("q")
+    constant_tags = bytearray()
+    for c in constants:
+        if c is True or c is False:
+            constant_values.append(c)
+            constant_tags.append(TAG_BOOL)
+        elif c in INT64:
+            constant_values.append(c)
+            constant_tags.append(TAG_INT)
+        else:
+            constant_values.append(len(strings))
+            constant_tags.append(TAG_BIG_INT)
+            strings.append(str(c).encode())
+
+    offsets = array.array("I", [0])
+    for s in strings:
+        offsets.append(offsets[-1] + len(s))
+    blob = b"".join(strings)
+
+    sections = [
+        function_words.tobytes(),
+        constant_values.tobytes() + constant_tags,
+        offsets.tobytes() + blob,
+        words.tobytes(),
+    ]
+
+    position = HEADER.size + len(padding(HEADER.size))
+    section_offsets = []
+    for s in sections:
+        section_offsets.append(position)
+        position += len(s) + len(padding(len(s)))
+
+    entry = function_index[program.entry] if program.entry is not None else -1
+    f.write(
+        HEADER.pack(
+            MAGIC,
+            VERSION,
+            BYTE_ORDERS[sys.byteorder],
+            len(program.instructions),
+            len(functions),
+            len(program.global_names),
+            len(constants),
+            len(strings),
+            entry,
+            *section_offsets,
+        )
+    )
+    f.write(padding(HEADER.size))
+    for s in sections:
+        f.write(s)
+        f.write(padding(len(s)))
+
+
+class Image:
+    """A binary TAC image mapped into memory, read in place."""
+
+    __slots__ = (
+        "buffer",
+        "instructions",
+        "n_instructions",
+        "functions",
+        "n_globals",
+        "constants",
+        "strings",
+        "entry",
+    )
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        view = memoryview(buffer)
+
+        if len(view) < HEADER.size:
+            raise FormatError("Truncated header")
+
+        (
+            magic,
+            version,
+            byte_order,
+            n_instructions,
+            n_functions,
+            n_globals,
+            n_constants,
+            n_strings,
+            entry,
+            functions_at,
+            constants_at,
+            strings_at,
+            instructions_at,
+        ) = HEADER.unpack_from(view)
+
+        if magic != MAGIC:
+            raise FormatError("Not a binary TAC image")
+        if version != VERSION:
+            raise FormatError(f"Unsupported image version {version}")
+        if byte_order != BYTE_ORDERS[sys.byteorder]:
+            raise FormatError("Image was written with a different byte order")
+
+        function_words = view[functions_at : functions_at + 16 * n_functions].cast("i")
+        functions = []
+        for i in range(n_functions):
+            start, end, n_slots, label = function_words[4 * i : 4 * i + 4]
+            fn = Function(None, start, end)
+            fn.n_slots = n_slots
+            functions.append((fn, label))
+
+        size = INSTRUCTION_WORDS * n_instructions
+        if len(view) < instructions_at + 4 * size:
+            raise FormatError("Truncated image")
+
+        offsets = view[strings_at : strings_at + 4 * (n_strings + 1)].cast("I")
+        blob = strings_at + 4 * (n_strings + 1)
+        # Slices of the mapping, not copies
+        self.strings = [
+            view[blob + offsets[i] : blob + offsets[i + 1]] for i in range(n_strings)
+        ]
+
+        values = view[constants_at : constants_at + 8 * n_constants].cast("q")
+        tags = view[constants_at + 8 * n_constants :][:n_constants]
+        self.constants = values.tolist()
+        for i, t in enumerate(tags):
+            if t == TAG_BOOL:
+                self.constants[i] = bool(self.constants[i])
+            elif t == TAG_BIG_INT:
+                self.constants[i] = int(bytes(self.strings[self.constants[i]]))
+        for fn, label in functions:
+            fn.label = bytes(self.strings[label]).decode()
+        self.functions = [fn for fn, _ in functions]
+
+        self.instructions = view[instructions_at : instructions_at + 4 * size].cast("i")
+        self.n_instructions = n_instructions
+        self.n_globals = n_globals
+        self.entry = self.functions[entry] if entry >= 0 else None
+
+
+def load(path):
+    with open(path, "rb") as f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be mapped
+            raise FormatError("Truncated header") from None
+    return Image(buffer)
+
+
+def run(image, output=None):
+    if output is None:
+        output = Output()
+    write = output.write
+    putw = output.putw
+
+    words = image.instructions
+    constants = image.constants
+    strings = image.strings
+    functions = image.functions
+    operators = [OPERATORS[name] for name in OPERATOR_NAMES]
+
+    globals_ = [None] * image.n_globals
+    frame = None
+    function = None
+    # Saved (function, frame, return pointer) of every active caller
+    calls = []
+    stack = []
+
+    def value(kind, v):
+        if kind == LOCAL:
+            return frame[v]
+        elif kind == GLOBAL:
+            return globals_[v]
+        return constants[v]
+
+    pc = 0
+    end = image.n_instructions
+    try:
+        while pc < end:
+            base = pc * INSTRUCTION_WORDS
+            head = words[base]
+            op = head & 0xFF
+            pc += 1
+
+            if op == LABEL:
+                pass
+            elif op == GOTO:
+                pc = words[base + 1]
+            elif op == PUTS:
+                write(strings[words[base + 1]])
+            elif op == PUTW:
+                putw(value(head >> 8 & 3, words[base + 2]))
+            elif op == IF_FALSE:
+                if value(head >> 8 & 3, words[base + 2]) is False:
+                    pc = words[base + 1]
+            elif op == RETURN or op == RETURN_VALUE:
+                if op == RETURN_VALUE:
+                    stack.append(value(head >> 8 & 3, words[base + 2]))
+                function.release_frame(frame)
+                if not calls:
+                    # Returning from the entry point ends the program
+                    break
+                function, frame, pc = calls.pop()
+            elif op == PUSH:
+                stack.append(value(head >> 8 & 3, words[base + 2]))
+            elif op == FCALL or op == ENTER:
+                if op == FCALL:
+                    calls.append((function, frame, pc))
+                function = functions[words[base + 1]]
+                frame = function.new_frame()
+                pc = function.start
+            else:
+                if op == POP:
+                    result = stack.pop()
+                elif op == COPY:
+                    result = value(head >> 8 & 3, words[base + 2])
+                elif op == NOT:
+                    result = not value(head >> 8 & 3, words[base + 2])
+                elif op == BINARY:
+                    result = operators[head >> 16](
+                        value(head >> 8 & 3, words[base + 2]),
+                        value(head >> 10 & 3, words[base + 3]),
+                    )
+                else:
+                    raise RuntimeError("Not implemented")
+
+                if head >> 12 & 3 == LOCAL:
+                    frame[words[base + 1]] = result
+                else:
+                    globals_[words[base + 1]] = result
+    finally:
+        output.flush()
+
+    return image.entry is not None
+
+
+if __name__ == "__main__":
+    import interpret
+
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} IMAGE < program.tac", file=sys.stderr)
+        sys.exit(2)
+
+    program = interpret.load(l.strip("\n") for l in sys.stdin)
+    with open(sys.argv[1], "wb") as f:
+        dump(program, f)
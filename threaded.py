@@ -0,0 +1,253 @@
+from interpret import (
+    LABEL,
+    GOTO,
+    PUTS,
+    PUTW,
+    IF_FALSE,
+    RETURN,
+    RETURN_VALUE,
+    PUSH,
+    POP,
+    FCALL,
+    COPY,
+    NOT,
+    BINARY,
+    ENTER,
+    CONST,
+    LOCAL,
+)
+from output import Output
+
+
+class State:
+    __slots__ = ("frame", "function")
+
+    def __init__(self):
+        self.frame = None
+        self.function = None
+
+
+def skip_labels(instructions, target):
+    # Jumps land on the first real instruction after a run of labels
+    while target < len(instructions) and instructions[target][0] == LABEL:
+        target += 1
+    return target
+
+
+def compile_program(program, state, globals_, stack, calls, output):
+    instructions = program.instructions
+    write = output.write
+    putw = output.putw
+    end = len(instructions)
+
+    def fetcher(operand):
+        kind, value = operand
+        if kind == CONST:
+            return lambda: value
+        elif kind == LOCAL:
+            return lambda: state.frame[value]
+        return lambda: globals_[value]
+
+    def compile_instruction(i, ins):
+        op = ins[0]
+        nxt = skip_labels(instructions, i + 1)
+
+        if op == LABEL:
+
+            def run():
+                return nxt
+
+        elif op == GOTO:
+            target = skip_labels(instructions, ins[1])
+
+            def run():
+                return target
+
+        elif op == PUTS:
+            string = program.strings[ins[1]]
+
+            def run():
+                write(string)
+                return nxt
+
+        elif op == PUTW:
+            fetch = fetcher(ins[1])
+
+            def run():
+                putw(fetch())
+                return nxt
+
+        elif op == IF_FALSE:
+            (kind, a), target = ins[1], skip_labels(instructions, ins[2])
+            if kind == CONST:
+                jump = target if a is False else nxt
+
+                def run():
+                    return jump
+
+            elif kind == LOCAL:
+
+                def run():
+                    if state.frame[a] is False:
+                        return target
+                    return nxt
+
+            else:
+
+                def run():
+                    if globals_[a] is False:
+                        return target
+                    return nxt
+
+        elif op == RETURN or op == RETURN_VALUE:
+            fetch = fetcher(ins[1]) if op == RETURN_VALUE else None
+
+            def run():
+                if fetch is not None:
+                    stack.append(fetch())
+                state.function.release_frame(state.frame)
+                if not calls:
+                    # Returning from the entry point ends the program
+                    return end
+                state.function, state.frame, ret = calls.pop()
+                return ret
+
+        elif op == PUSH:
+            fetch = fetcher(ins[1])
+
+            def run():
+                stack.append(fetch())
+                return nxt
+
+        elif op == POP:
+            kind, d = ins[1]
+            if kind == LOCAL:
+
+                def run():
+                    state.frame[d] = stack.pop()
+                    return nxt
+
+            else:
+
+                def run():
+                    globals_[d] = stack.pop()
+                    return nxt
+
+        elif op == ENTER:
+            entry = ins[1]
+            start = skip_labels(instructions, entry.start)
+
+            def run():
+                state.function = entry
+                state.frame = entry.new_frame()
+                return start
+
+        elif op == FCALL:
+            callee = ins[1]
+            start = skip_labels(instructions, callee.start)
+            ret = i + 1
+
+            def run():
+                calls.append((state.function, state.frame, ret))
+                state.function = callee
+                state.frame = callee.new_frame()
+                return start
+
+        elif op == COPY:
+            (kind, d), (src_kind, a) = ins[1], ins[2]
+            if kind == LOCAL and src_kind == CONST:
+
+                def run():
+                    state.frame[d] = a
+                    return nxt
+
+            elif kind == LOCAL and src_kind == LOCAL:
+
+                def run():
+                    frame = state.frame
+                    frame[d] = frame[a]
+                    return nxt
+
+            elif kind == LOCAL:
+
+                def run():
+                    state.frame[d] = globals_[a]
+                    return nxt
+
+            elif src_kind == CONST:
+
+                def run():
+                    globals_[d] = a
+                    return nxt
+
+            elif src_kind == LOCAL:
+
+                def run():
+                    globals_[d] = state.frame[a]
+                    return nxt
+
+            else:
+
+                def run():
+                    globals_[d] = globals_[a]
+                    return nxt
+
+        elif op == NOT:
+            (kind, d), handler, a = ins[1], ins[2], ins[3]
+            if kind == LOCAL:
+
+                def run():
+                    frame = state.frame
+                    frame[d] = handler(frame, globals_, a)
+                    return nxt
+
+            else:
+
+                def run():
+                    globals_[d] = handler(state.frame, globals_, a)
+                    return nxt
+
+        elif op == BINARY:
+            (kind, d), handler, a, b = ins[1], ins[2], ins[3], ins[4]
+            if kind == LOCAL:
+
+                def run():
+                    frame = state.frame
+                    frame[d] = handler(frame, globals_, a, b)
+                    return nxt
+
+            else:
+
+                def run():
+                    globals_[d] = handler(state.frame, globals_, a, b)
+                    return nxt
+
+        else:
+            raise RuntimeError("Not implemented")
+
+        return run
+
+    return [compile_instruction(i, ins) for i, ins in enumerate(instructions)]
+
+
+def run(program, output=None):
+    if output is None:
+        output = Output()
+
+    state = State()
+    globals_ = [None] * len(program.global_names)
+    stack = []
+    # Saved (function, frame, return pointer) of every active caller
+    calls = []
+
+    code = compile_program(program, state, globals_, stack, calls, output)
+    end = len(code)
+
+    try:
+        pc = 0
+        while pc < end:
+            pc = code[pc]()
+    finally:
+        output.flush()
+
+    return program.entry is not None
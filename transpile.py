@@ -0,0 +1,382 @@
+import ast
+import hashlib
+import marshal
+import os
+import sys
+import threading
+
+from interpret import c_div, c_mod, is_constant, constant_value
+from output import Output
+
+# Bump when the generated code changes so stale cache entries are ignored
+VERSION = 2
+
+# Where interpret.py --cache keeps compiled programs
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "tac_python"
+)
+
+# TAC calls are Python calls in the transpiled code, so programs run on a
+# thread with room for this many nested calls
+RECURSION_LIMIT = 1 << 20
+STACK_SIZE = 1 << 30
+
+# Runs on deep threads share the raised recursion limit, which is restored
+# when the last of them ends
+_deep_lock = threading.Lock()
+_deep_runs = 0
+_saved_limit = None
+
+BINARY_TEMPLATES = {
+    "+": "{} + {}",
+    "-": "{} - {}",
+    "*": "{} * {}",
+    "/": "_div({}, {})",
+    "mod": "_mod({}, {})",
+    "<": "{} < {}",
+    ">": "{} > {}",
+    "<=": "{} <= {}",
+    ">=": "{} >= {}",
+    "==": "{} == {}",
+    "!=": "{} != {}",
+    "&&": "({} and {})",
+    "||": "({} or {})",
+}
+
+
+class Unstructured(Exception):
+    pass
+
+
+def py_name(label):
+    return label[1:]
+
+
+def py_operand(operand):
+    if is_constant(operand):
+        return repr(constant_value(operand))
+    return operand
+
+
+def py_statement(line):
+    # Translation of a TAC line that neither jumps nor defines a label
+    p = line.split()
+    if p[0] == "puts":
+        string = ast.literal_eval(line.split(maxsplit=1)[1]) + "\n"
+        return f"_write({repr(string.encode())})"
+    elif p[0] == "putw":
+        return f"_putw({py_operand(p[1])})"
+    elif p[0] == "return":
+        if len(p) == 1:
+            return "return"
+        return f"_stack.append({py_operand(p[1])}); return"
+    elif p[0] == "push":
+        return f"_stack.append({py_operand(p[1])})"
+    elif p[0] == "pop":
+        return f"{p[1]} = _stack.pop()"
+    elif p[0] == "fcall":
+        return f"{py_name(p[1])}()"
+    elif len(p) == 3 and p[1] == "=":
+        return f"{p[0]} = {py_operand(p[2])}"
+    elif len(p) == 4 and p[1] == "=" and p[2] == "not":
+        return f"{p[0]} = not {py_operand(p[3])}"
+    elif len(p) == 5 and p[1] == "=" and p[3] in BINARY_TEMPLATES:
+        expression = BINARY_TEMPLATES[p[3]].format(py_operand(p[2]), py_operand(p[4]))
+        return f"{p[0]} = {expression}"
+
+    raise RuntimeError(f"Not implemented: {line}")
+
+
+def is_jump(p):
+    return p[0] in ("goto", "ifFalse")
+
+
+class Structurer:
+    """Rebuilds while/if/if-else statements from the jumps a_code emits."""
+
+    __slots__ = ("lines", "split", "labels", "out")
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.split = [l.split() for l in lines]
+        self.labels = {l: i for i, l in enumerate(lines) if l[0] == ":"}
+        self.out = []
+
+    def emit(self, depth, statement):
+        self.out.append("    " * depth + statement)
+
+    def straight_line(self, lo, hi):
+        return all(
+            self.lines[i][0] != ":" and not is_jump(self.split[i])
+            for i in range(lo, hi)
+        )
+
+    def match_while(self, i, hi):
+        # :start, condition, ifFalse c goto :end, body, goto :start, :end
+        label = self.lines[i]
+        for j in range(hi - 2, i, -1):
+            if self.split[j] == ["goto", label]:
+                break
+        else:
+            return None
+
+        exit_label = self.lines[j + 1]
+        for k in range(i + 1, j):
+            p = self.split[k]
+            if p[0] == "ifFalse" and p[3] == exit_label:
+                if self.straight_line(i + 1, k):
+                    return k, j
+                return None
+            if is_jump(p) or self.lines[k][0] == ":":
+                return None
+
+        return None
+
+    def structure(self, lo, hi, depth):
+        start = len(self.out)
+
+        i = lo
+        while i < hi:
+            p = self.split[i]
+            line = self.lines[i]
+
+            if line[0] == ":":
+                loop = self.match_while(i, hi)
+                if loop is None:
+                    i += 1
+                    continue
+
+                k, j = loop
+                self.emit(depth, "while True:")
+                for c in range(i + 1, k):
+                    self.emit(depth + 1, py_statement(self.lines[c]))
+                self.emit(depth + 1, f"if {py_operand(self.split[k][1])} is False:")
+                self.emit(depth + 2, "break")
+                self.structure(k + 1, j, depth + 1)
+                i = j + 2
+            elif p[0] == "goto":
+                # Function definition guards jump straight to the next line
+                if i + 1 < hi and self.lines[i + 1] == p[1]:
+                    i += 1
+                    continue
+                raise Unstructured(line)
+            elif p[0] == "ifFalse":
+                m = self.labels.get(p[3])
+                if m is None or not i < m < hi:
+                    raise Unstructured(line)
+
+                condition = py_operand(p[1])
+                before_else = self.split[m - 1]
+                n = None
+                if before_else[0] == "goto":
+                    n = self.labels.get(before_else[1])
+
+                if n is not None and m < n < hi:
+                    self.emit(depth, f"if {condition} is not False:")
+                    self.structure(i + 1, m - 1, depth + 1)
+                    self.emit(depth, "else:")
+                    self.structure(m + 1, n, depth + 1)
+                    i = n
+                else:
+                    self.emit(depth, f"if {condition} is not False:")
+                    self.structure(i + 1, m, depth + 1)
+                    i = m
+            else:
+                self.emit(depth, py_statement(line))
+                i += 1
+
+        if len(self.out) == start:
+            self.emit(depth, "pass")
+
+
+def switch_body(lines, depth):
+    # Fallback for control flow the structurer does not recognise: one
+    # `pc` case per basic block inside a dispatch loop
+    split = [l.split() for l in lines]
+
+    leaders = {0}
+    for i, p in enumerate(split):
+        if lines[i][0] == ":":
+            leaders.add(i)
+        if is_jump(p) or p[0] == "return":
+            leaders.add(i + 1)
+    leaders = sorted(l for l in leaders if l <= len(lines))
+    block_of = {l: b for b, l in enumerate(leaders)}
+    labels = {l: block_of[i] for i, l in enumerate(lines) if l[0] == ":"}
+
+    out = []
+    indent = "    " * depth
+    out.append(f"{indent}pc = 0")
+    out.append(f"{indent}while True:")
+    for b, lo in enumerate(leaders):
+        hi = leaders[b + 1] if b + 1 < len(leaders) else len(lines)
+        out.append(f"{indent}    {'if' if b == 0 else 'elif'} pc == {b}:")
+
+        terminated = False
+        for i in range(lo, hi):
+            p = split[i]
+            if lines[i][0] == ":":
+                continue
+            elif p[0] == "goto":
+                out.append(f"{indent}        pc = {labels[p[1]]}")
+                terminated = True
+            elif p[0] == "ifFalse":
+                out.append(
+                    f"{indent}        pc = {labels[p[3]]} "
+                    f"if {py_operand(p[1])} is False else {b + 1}"
+                )
+                terminated = True
+            else:
+                out.append(f"{indent}        {py_statement(lines[i])}")
+                terminated = p[0] == "return"
+
+        if not terminated:
+            if hi == len(lines):
+                out.append(f"{indent}        return")
+            else:
+                out.append(f"{indent}        pc = {b + 1}")
+
+    return out
+
+
+def function_source(name, lines, global_names):
+    used = set()
+    for l in lines:
+        used.update(t for t in l.split() if t in global_names)
+
+    out = [f"def {name}():"]
+    if used:
+        out.append(f"    global {', '.join(sorted(used))}")
+
+    try:
+        structurer = Structurer(lines)
+        structurer.structure(0, len(lines), 1)
+        out += structurer.out
+    except Unstructured:
+        out += switch_body(lines, 1)
+
+    return "\n".join(out)
+
+
+def transpile(program):
+    code = program.code
+    if program.entry is not None:
+        # Entering main is done by run() after calling _init
+        code = code[:-1]
+    global_names = set(program.global_names)
+
+    sources = []
+    in_function = [False] * len(code)
+    for f in program.functions.values():
+        for i in range(f.start, f.end):
+            in_function[i] = True
+
+        body = code[f.start + 1 : f.end]
+        sources.append(function_source(py_name(f.label), body, global_names))
+
+    init = [l for l, inside in zip(code, in_function) if not inside]
+    sources.append(function_source("_init", init, global_names))
+
+    return "\n\n\n".join(sources) + "\n"
+
+
+def compile_program(program, cache_dir=None):
+    key = hashlib.sha256(
+        f"{VERSION}\n{sys.version}\n".encode() + "\n".join(program.code).encode()
+    ).hexdigest()
+
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, f"{key}.marshal")
+        try:
+            with open(cache_file, "rb") as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    code = compile(transpile(program), f"<tac {key[:12]}>", "exec")
+
+    if cache_file is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump(code, f)
+            os.replace(tmp, cache_file)
+        except OSError:
+            pass
+
+    return code
+
+
+def run_deep(function):
+    # Calls function on a thread with a large stack and a raised recursion
+    # limit, and raises what it raised
+    global _deep_runs, _saved_limit
+    raised = []
+
+    def target():
+        try:
+            function()
+        except BaseException as e:
+            raised.append(e)
+
+    with _deep_lock:
+        if _deep_runs == 0:
+            _saved_limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(max(_saved_limit, RECURSION_LIMIT))
+        _deep_runs += 1
+    try:
+        with _deep_lock:
+            size = threading.stack_size(STACK_SIZE)
+            try:
+                thread = threading.Thread(target=target, daemon=True)
+                thread.start()
+            finally:
+                threading.stack_size(size)
+        thread.join()
+    finally:
+        with _deep_lock:
+            _deep_runs -= 1
+            if _deep_runs == 0:
+                sys.setrecursionlimit(_saved_limit)
+
+    if raised:
+        raise raised[0]
+
+
+def run(program, output=None, cache_dir=None):
+    # Compiled programs are cached in `cache_dir` if one is given
+    if output is None:
+        output = Output()
+
+    namespace = {
+        "_stack": [],
+        "_div": c_div,
+        "_mod": c_mod,
+        "_write": output.write,
+        "_putw": output.putw,
+        "__builtins__": __builtins__,
+    }
+    for name in program.global_names:
+        namespace[name] = None
+
+    exec(compile_program(program, cache_dir), namespace)
+
+    def main():
+        namespace["_init"]()
+        if program.entry is not None:
+            namespace[py_name(program.entry.label)]()
+
+    try:
+        run_deep(main)
+    finally:
+        output.flush()
+
+    return program.entry is not None
+
+
+if __name__ == "__main__":
+    import interpret
+
+    print(transpile(interpret.load(l.strip("\n") for l in sys.stdin)), end="")